@@ -1,22 +1,8 @@
 import os
+import sys
 import re
 from datetime import datetime
-
-def get_constants():
-    c = {}
-    if not os.path.exists('CONSTANTS.txt'):
-        return None
-    with open('CONSTANTS.txt', 'r') as f:
-        for line in f:
-            if '=' in line and not line.startswith('#'):
-                parts = line.strip().split('=')
-                if len(parts) == 2:
-                    k, v = parts
-                    try:
-                        c[k] = float(v)
-                    except ValueError:
-                        c[k] = v
-    return c
+from sparc.constants import get_constants
 
 def parse_new_log(content):
     runs = []
@@ -36,7 +22,7 @@ def parse_new_log(content):
                 run_data['stats'][current_site] = {}
                 continue
             
-            stratum_match = re.search(r"(S\d): Yield=([\d.]+), Target Invites=(\d+)", line)
+            stratum_match = re.search(r"(S\d+): Yield=([\d.]+), Target Invites=(\d+)", line)
             if stratum_match and current_site:
                 s = stratum_match.group(1)
                 y = stratum_match.group(2)
@@ -50,7 +36,7 @@ def parse_new_log(content):
         runs.append(run_data)
     return runs
 
-def main():
+def main(argv=None):
     C = get_constants()
     log_dir = C.get('LOG_DIR', 'study_data/logs')
     
@@ -79,4 +65,4 @@ def main():
                 print(f"{run['date']:<20} | {site:<5} | {s:<7} | {y:<6} | {a:<5}")
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -7,14 +7,8 @@ def create_mgb_toy():
     
     # Generate 100 candidates distributed across strata
     for i in range(100):
+        # Strata are assigned from model_pctile by update_master.py (STRATUM_CUTS)
         pctile = random.uniform(0, 100)
-        stratum = 'S6'
-        if pctile > 95: stratum = 'S1'
-        elif pctile > 90: stratum = 'S2'
-        elif pctile > 80: stratum = 'S3'
-        elif pctile > 50: stratum = 'S4'
-        elif pctile > 10: stratum = 'S5'
-        
         data.append([
             f'MOM_M{i}', 'Smith', 'Jane', '555-0101', 
             f'CHILD_M{i}', 'Smith', 'Alice', 'F', 
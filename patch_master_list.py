@@ -1,40 +1,21 @@
 import csv
 import os
+import sys
 import shutil
 import argparse
 from datetime import datetime
+from sparc.constants import get_constants
+from sparc.event_log import write_snapshot, lookup_master_rows
 
-def get_constants():
-    c = {}
-    if not os.path.exists('CONSTANTS.txt'):
-        return None
-    with open('CONSTANTS.txt', 'r') as f:
-        for line in f:
-            if '=' in line and not line.startswith('#'):
-                parts = line.strip().split('=')
-                if len(parts) == 2:
-                    k, v = parts
-                    try:
-                        c[k] = float(v)
-                    except ValueError:
-                        c[k] = v
-    return c
-
-def save_csv(data, fieldnames, filename):
-    with open(filename, 'w', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(data)
-
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Patch recruitment list to create new master list with blinded fields restored (model_score, model_pctile, stratum)")
     parser.add_argument("recruitment_file", help="Input recruitment CSV file (recruitment_YYYYMMDD.csv)")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     recruitment_file = args.recruitment_file
     if not os.path.exists(recruitment_file):
         print(f"Error: Recruitment file {recruitment_file} not found.")
-        return
+        return 1
 
     C = get_constants()
     output_dir = C.get('OUTPUT_DIR', 'study_data/outputs')
@@ -46,7 +27,7 @@ def main():
 
     if not recruitment_rows:
         print("Error: Recruitment file is empty.")
-        return
+        return 1
 
     print(f"Loaded {len(recruitment_rows)} rows from recruitment list.")
 
@@ -54,35 +35,22 @@ def main():
     mgb_path = os.path.join(output_dir, 'parsed_mgb_master_list.csv')
     vumc_path = os.path.join(output_dir, 'parsed_vumc_master_list.csv')
 
-    master_data = {}  # MRN -> {model_score, model_pctile}
-
-    if os.path.exists(mgb_path):
-        with open(mgb_path, 'r') as f:
-            mgb_master = list(csv.DictReader(f))
-            for row in mgb_master:
-                mrn = row['offspring_MRN']
-                master_data[mrn] = {
-                    'model_score': row.get('model_score', ''),
-                    'model_pctile': row.get('model_pctile', ''),
-                    'stratum': row.get('stratum', '')
-                }
-        print(f"Loaded {len(mgb_master)} rows from MGB master list.")
-
-    if os.path.exists(vumc_path):
-        with open(vumc_path, 'r') as f:
-            vumc_master = list(csv.DictReader(f))
-            for row in vumc_master:
-                mrn = row['offspring_MRN']
-                master_data[mrn] = {
-                    'model_score': row.get('model_score', ''),
-                    'model_pctile': row.get('model_pctile', ''),
-                    'stratum': row.get('stratum', '')
-                }
-        print(f"Loaded {len(vumc_master)} rows from VUMC master list.")
-
-    if not master_data:
+    # Random access by MRN: only the recruitment MRNs' blinded fields are decoded
+    mrns = [row['offspring_MRN'] for row in recruitment_rows]
+    blinded_fields = ['model_score', 'model_pctile', 'stratum']
+    master_data = {}  # MRN -> {model_score, model_pctile, stratum}
+    found_master = False
+
+    for site, path in (('MGB', mgb_path), ('VUMC', vumc_path)):
+        if os.path.exists(path):
+            found_master = True
+            site_data = lookup_master_rows(path, mrns, blinded_fields)
+            master_data.update(site_data)
+            print(f"Found {len(site_data)} of {len(mrns)} MRNs in {site} master list.")
+
+    if not found_master:
         print("Error: No master lists found. Cannot retrieve blinded fields (model_score, model_pctile, stratum).")
-        return
+        return 1
 
     # Add model_score, model_pctile, and stratum back to recruitment rows
     # AIDEV-NOTE: These fields are excluded from recruitment list for blinding, but needed in master list
@@ -153,8 +121,8 @@ def main():
         if 'stratum' not in fieldnames:
             fieldnames.append('stratum')
 
-        # Save new master list
-        save_csv(site_rows, fieldnames, output_path)
+        # Save new master list (replaces the snapshot and archives its event log)
+        write_snapshot(output_path, site_rows, fieldnames, backup_dir, timestamp)
         print(f"Saved new {site} master list to {output_path} ({len(site_rows)} rows)")
 
         # Create backup of new version
@@ -167,4 +135,4 @@ def main():
     print(f"Sites updated: {', '.join(sites.keys())}")
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,221 @@
+import csv
+import os
+import sys
+import math
+import argparse
+from datetime import datetime
+from sparc.constants import get_constants
+from sparc.event_log import load_master_columns
+from sparc.strata import get_strata
+from update_recruitment import get_yield, allocate_targets
+
+PLAN_COLUMNS = ['stratum', 'status', 'offspring_DOB']
+
+def month_index(date_str):
+    """'YYYY-MM-DD' -> months since year 0 (None if unparseable)."""
+    try:
+        return int(date_str[:4]) * 12 + int(date_str[5:7]) - 1
+    except (ValueError, TypeError):
+        return None
+
+def month_label(idx):
+    return f"{idx // 12:04d}-{idx % 12 + 1:02d}"
+
+def project_supply(rows, strata, start_idx, n_months, age_min, age_max, new_per_month=0.0):
+    """
+    Precompute per-month aggregate arrays for one site.
+
+    Returns (initial, entering, aging_out): initial[s] is the number of
+    uninvited rows eligible in month 0; entering[s][m] / aging_out[s][m] are
+    the rows whose DOB-derived eligibility window opens / closes at month m.
+    Expected new dump rows (new_per_month, spread by the site's current
+    stratum mix) enter eligible and stay for the full window.
+    """
+    enter_offset = math.ceil(age_min * 12)
+    exit_offset = math.ceil(age_max * 12)
+    initial = {s: 0 for s in strata}
+    entering = {s: [0.0] * n_months for s in strata}
+    aging_out = {s: [0.0] * n_months for s in strata}
+    mix = {s: 0 for s in strata}
+
+    for r in rows:
+        s = r.get('stratum')
+        if s not in mix:
+            continue
+        mix[s] += 1
+        if r['status'] != 'Not Invited':
+            continue
+        dob = month_index(r['offspring_DOB'])
+        if dob is None:
+            continue
+        enter = dob + enter_offset - start_idx
+        leave = dob + exit_offset - start_idx
+        if leave <= 0 or enter >= n_months:
+            continue
+        if enter <= 0:
+            initial[s] += 1
+        else:
+            entering[s][enter] += 1
+        if leave < n_months:
+            aging_out[s][leave] += 1
+
+    if new_per_month and rows:
+        window = exit_offset - enter_offset
+        for s in strata:
+            per_month = new_per_month * mix[s] / len(rows)
+            for m in range(1, n_months):
+                entering[s][m] += per_month
+                if m + window < n_months:
+                    aging_out[s][m + window] += per_month
+
+    return initial, entering, aging_out
+
+def simulate(initial, entering, aging_out, strata, site_target, weights, yields, paced=True):
+    """
+    Allocate invites month by month across the horizon.
+
+    Each month the yield-adjusted targets are computed as in
+    update_recruitment.py and shortfalls cascade to the next stratum. When
+    `paced`, a stratum may only draw its expected supply (current pool plus
+    future entries) spread evenly over the remaining months, so scarce strata
+    (S1/S2) are not exhausted early; rows about to age out may always be
+    drawn. The fractional part of each month's allowance carries over, so
+    a stratum paced at e.g. 0.4 invites/month still gets its invites
+    rather than rounding to zero until its rows expire. Aging-out is
+    assumed to hit invited and uninvited rows uniformly.
+    """
+    n_months = len(next(iter(entering.values())))
+    adjusted = {s: weights[s] / yields[s] for s in strata}
+    total_adj = sum(adjusted.values())
+    desired = allocate_targets(site_target, {s: adjusted[s] / total_adj for s in strata})
+
+    # Suffix sums of future entries, used for pacing
+    future_in = {}
+    for s in strata:
+        acc, suffix = 0.0, [0.0] * (n_months + 1)
+        for m in range(n_months - 1, -1, -1):
+            acc += entering[s][m]
+            suffix[m] = acc
+        future_in[s] = suffix
+
+    pool = {s: float(initial[s]) for s in strata}
+    allowance = {s: 0.0 for s in strata}  # Paced invites accrued but not yet used
+    raw = {s: float(initial[s]) for s in strata}
+    months = []
+    for m in range(n_months):
+        if m > 0:
+            for s in strata:
+                survive = 1.0 - aging_out[s][m] / raw[s] if raw[s] else 0.0
+                pool[s] = max(pool[s] * survive, 0.0) + entering[s][m]
+                raw[s] = max(raw[s] - aging_out[s][m], 0.0) + entering[s][m]
+
+        carryover = 0
+        month = {}
+        for s in strata:
+            target = desired[s] + carryover
+            cap = pool[s]
+            if paced:
+                spread = (pool[s] + future_in[s][m + 1]) / (n_months - m)
+                # Rows about to age out are used now rather than lost
+                expiring = pool[s] * aging_out[s][m + 1] / raw[s] if m + 1 < n_months and raw[s] else 0.0
+                allowance[s] += max(spread, expiring)
+                cap = min(cap, allowance[s])
+            invites = min(target, int(cap + 0.5), int(pool[s]))
+            if paced:
+                # Keep the rounding remainder (at most one invite's worth) for next month
+                allowance[s] = min(allowance[s] - invites, 1.0)
+            carryover = target - invites
+            month[s] = {'desired': desired[s], 'pool': pool[s], 'invites': invites,
+                        'expected_completed': invites * yields[s]}
+            pool[s] -= invites
+        month['_unfilled'] = carryover
+        months.append(month)
+    return months
+
+def first_dry_month(months, strata):
+    """First month each stratum could not supply its own desired target (None if never)."""
+    dry = {}
+    for s in strata:
+        dry[s] = next((m for m, month in enumerate(months) if month[s]['pool'] < month[s]['desired']), None)
+    return dry
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Project eligible supply and plan recruitment allocations over several months")
+    parser.add_argument("--months", type=int, required=True, help="Planning horizon in months")
+    parser.add_argument("--visits", type=int, required=True, help="Fresh invites per monthly batch")
+    parser.add_argument("--start", help="First planned month (YYYY-MM, default: current month)")
+    args = parser.parse_args(argv)
+
+    if args.months < 1:
+        print("Error: --months must be at least 1.")
+        return 1
+
+    C = get_constants()
+    output_dir = C.get('OUTPUT_DIR', 'study_data/outputs')
+    strata = get_strata(C)
+    weights = {s: C.get(f'{s}_WEIGHT', 0.1) for s in strata}
+    start_idx = month_index((args.start or datetime.now().strftime('%Y-%m')) + '-01')
+    if start_idx is None:
+        print(f"Error: --start must be YYYY-MM, got {args.start}.")
+        return 1
+
+    site_rows = {}
+    for site, name in (('MGB', 'parsed_mgb_master_list.csv'), ('VUMC', 'parsed_vumc_master_list.csv')):
+        path = os.path.join(output_dir, name)
+        if os.path.exists(path):
+            # Read-only: decode just the columns the projection needs
+            site_rows[site] = load_master_columns(path, PLAN_COLUMNS)
+    if not site_rows:
+        print("Error: No master lists found. Run update_master.py for at least one site first.")
+        return 1
+
+    # Same site split as update_recruitment.py
+    if len(site_rows) == 2:
+        mgb_target = int(args.visits * C.get('MGB_RATIO', 0.6667) + 0.5)
+        site_targets = {'MGB': mgb_target, 'VUMC': args.visits - mgb_target}
+    else:
+        site_targets = {site: args.visits for site in site_rows}
+
+    plan_rows = []
+    for site, rows in site_rows.items():
+        yields = {s: get_yield(rows, s, site=site, constants=C) for s in strata}
+        initial, entering, aging_out = project_supply(
+            rows, strata, start_idx, args.months, C['AGE_MIN'], C['AGE_MAX'],
+            new_per_month=float(C.get(f'{site}_NEW_PER_MONTH', 0.0)))
+        paced = simulate(initial, entering, aging_out, strata, site_targets[site], weights, yields)
+        greedy = simulate(initial, entering, aging_out, strata, site_targets[site], weights, yields, paced=False)
+
+        print(f"\nSite: {site} (Target New per month: {site_targets[site]})")
+        print(f"{'Month':<8} | " + " | ".join(f"{s + ' inv/pool':<13}" for s in strata) + " | Unfilled")
+        for m, month in enumerate(paced):
+            cells = " | ".join(f"{month[s]['invites']:>4}/{int(month[s]['pool']):<8}" for s in strata)
+            print(f"{month_label(start_idx + m):<8} | {cells} | {month['_unfilled']}")
+            for s in strata:
+                plan_rows.append({'month': month_label(start_idx + m), 'site': site, 'stratum': s,
+                                  'pool': int(month[s]['pool']), 'desired': month[s]['desired'],
+                                  'invites': month[s]['invites'],
+                                  'expected_completed': round(month[s]['expected_completed'], 2)})
+
+        # Expected completions vs S*_WEIGHT targets
+        completed = {s: sum(month[s]['expected_completed'] for month in paced) for s in strata}
+        total_completed = sum(completed.values()) or 1.0
+        total_weight = sum(weights.values())
+        greedy_dry = first_dry_month(greedy, strata)
+        print("  Expected completion mix (target weight) / month stratum runs dry without pacing:")
+        for s in strata:
+            dry = month_label(start_idx + greedy_dry[s]) if greedy_dry[s] is not None else '-'
+            print(f"  {s}: {completed[s] / total_completed * 100:5.1f}% ({weights[s] / total_weight * 100:.0f}%)  dry: {dry}")
+        unfilled = sum(month['_unfilled'] for month in paced)
+        if unfilled > 0:
+            print(f"  WARNING: {unfilled} invites unfilled over the horizon - insufficient projected supply")
+
+    if not os.path.exists(output_dir): os.makedirs(output_dir)
+    output_path = os.path.join(output_dir, f"plan_{datetime.now().strftime('%Y%m%d')}.csv")
+    with open(output_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(plan_rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(plan_rows)
+    print(f"\nSaved plan to {output_path}")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+import os
+import sys
+import argparse
+from datetime import datetime
+from sparc.constants import get_constants, save_constants
+from sparc.event_log import load_master, capture, record_changes, compact_if_needed, new_run_id
+from sparc.strata import Stratifier, parse_cuts, get_cut_points, get_strata, describe_bands
+from update_master import generate_integrity_hash
+
+MASTER_LISTS = [('MGB', 'parsed_mgb_master_list.csv'), ('VUMC', 'parsed_vumc_master_list.csv')]
+RESTRATIFY_FIELDS = ['stratum', 'integrity_hash']
+
+def restratify_rows(rows, stratify):
+    """
+    Reassign stratum and integrity_hash in place.
+
+    Returns (migrations, unparsed): migrations[(old, new)] counts every row,
+    including unchanged ones; rows whose model_pctile cannot be parsed keep
+    their current stratum and are counted in unparsed.
+    """
+    migrations = {}
+    unparsed = 0
+    for r in rows:
+        old = r.get('stratum', '')
+        try:
+            new = stratify(r.get('model_pctile'))
+        except (ValueError, TypeError):
+            unparsed += 1
+            new = old
+        if new != old:
+            r['stratum'] = new
+            r['integrity_hash'] = generate_integrity_hash(r)
+        migrations[(old, new)] = migrations.get((old, new), 0) + 1
+    return migrations, unparsed
+
+def print_migrations(site, migrations, unparsed):
+    old_strata = sorted({o for o, _ in migrations}, key=lambda s: (len(s), s))
+    new_strata = sorted({n for _, n in migrations}, key=lambda s: (len(s), s))
+    moved = sum(n for (o, s), n in migrations.items() if o != s)
+    print(f"\n{site}: {moved} of {sum(migrations.values())} rows change stratum")
+    corner = 'old/new'
+    print(f"  {corner:<9} | " + " | ".join(f"{s:>6}" for s in new_strata))
+    for o in old_strata:
+        print(f"  {o or '(none)':<9} | " + " | ".join(f"{migrations.get((o, s), 0):>6}" for s in new_strata))
+    if unparsed:
+        print(f"  Warning: {unparsed} rows have an unparseable model_pctile and keep their stratum.")
+
+def parse_values(text, n, name):
+    """'0.4,0.2,...' -> n floats, one per new stratum (ValueError otherwise)."""
+    values = [float(v) for v in text.split(',') if v.strip()]
+    if len(values) != n:
+        raise ValueError(f"--{name} needs {n} values (S1..S{n}), got {len(values)}")
+    return values
+
+def print_band_changes(old_cuts, new_cuts):
+    """Side-by-side percentile band of each stratum label before and after."""
+    old_bands, new_bands = describe_bands(old_cuts), describe_bands(new_cuts)
+    print("Stratum bands (old -> new):")
+    for label in sorted(set(old_bands) | set(new_bands), key=lambda s: int(s[1:])):
+        old = old_bands.get(label, '(none)')
+        new = new_bands.get(label, '(removed)')
+        print(f"  {label:<3} {old:<16} -> {new:<16}{'' if old == new else ' *changed'}")
+
+def apply_settings(C, strata, weights, yields):
+    """Replace S*_WEIGHT / S*_YIELD for the new strata and drop keys for labels that no longer exist."""
+    for key in [k for k in C if k.endswith(('_WEIGHT', '_YIELD')) and k.split('_')[-2] not in strata]:
+        del C[key]
+    for s, w in zip(strata, weights):
+        C[f'{s}_WEIGHT'] = w
+    for s, y in zip(strata, yields):
+        C[f'{s}_YIELD'] = y
+    # Site-specific yield defaults referred to the old bands
+    stale = [k for k in C if k.endswith('_YIELD') and k.count('_') == 2]
+    for key in stale:
+        del C[key]
+    if stale:
+        print(f"Removed site-specific yield defaults for the old bands: {', '.join(stale)}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reassign strata in the master lists after a change of model percentile cut points")
+    parser.add_argument("--cuts", help="New cut points, e.g. 97,95,90,80,50,10 (default: STRATUM_CUTS in CONSTANTS.txt)")
+    parser.add_argument("--weights", help="S*_WEIGHT for each new stratum, e.g. 0.35,0.2,0.15,0.12,0.09,0.09")
+    parser.add_argument("--yields", help="Default S*_YIELD for each new stratum, e.g. 0.2,0.2,0.2,0.2,0.2,0.2")
+    parser.add_argument("--keep-settings", action="store_true",
+                        help="Keep the current S*_WEIGHT / S*_YIELD values for the renumbered strata")
+    parser.add_argument("--dry-run", action="store_true", help="Report migrations without changing any files")
+    args = parser.parse_args(argv)
+
+    C = get_constants()
+    output_dir = C.get('OUTPUT_DIR', 'study_data/outputs')
+    backup_dir = C.get('BACKUP_DIR', 'study_data/backups')
+
+    try:
+        cuts = parse_cuts(args.cuts) if args.cuts else get_cut_points(C)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    stratify = Stratifier(cuts)
+    print(f"Cut points: {', '.join(f'{c:g}' for c in cuts)} ({len(cuts) + 1} strata)")
+    old_cuts = get_cut_points(C)
+    print_band_changes(old_cuts, cuts)
+
+    # AIDEV-NOTE: S*_WEIGHT / S*_YIELD are per label, so new cut points silently change what
+    # they apply to. Require settings for the new table (or an explicit --keep-settings).
+    new_strata = [f'S{i}' for i in range(1, len(cuts) + 2)]
+    weights = yields = None
+    if args.weights or args.yields or (cuts != old_cuts and not args.dry_run and not args.keep_settings):
+        if bool(args.weights) != bool(args.yields):
+            print("Error: --weights and --yields must be given together.")
+            return 1
+        if not args.weights:
+            print(f"Error: The new cut points change the percentile band of each stratum label. Give --weights "
+                  f"and --yields for {new_strata[0]}..{new_strata[-1]} ({len(new_strata)} values each), or "
+                  f"--keep-settings to keep the current S*_WEIGHT / S*_YIELD values.")
+            return 1
+        try:
+            weights = parse_values(args.weights, len(new_strata), 'weights')
+            yields = parse_values(args.yields, len(new_strata), 'yields')
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+
+    run_id = new_run_id()
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M')
+    found = False
+    for site, name in MASTER_LISTS:
+        path = os.path.join(output_dir, name)
+        if not os.path.exists(path):
+            continue
+        found = True
+        rows = load_master(path)
+        before = capture(rows, RESTRATIFY_FIELDS)
+        migrations, unparsed = restratify_rows(rows, stratify)
+        print_migrations(site, migrations, unparsed)
+
+        if not args.dry_run:
+            # Only rows whose stratum changed are written, as events in the master's log
+            n_events = record_changes(path, before, rows, run_id, fields=RESTRATIFY_FIELDS)
+            if compact_if_needed(path, rows, float(C.get('EVENT_LOG_MAX_MB', 5.0)), backup_dir, timestamp):
+                print(f"  Compacted event log into {name}")
+            print(f"  Recorded {n_events} changes")
+
+    if not found:
+        print("Error: No master lists found. Run update_master.py for at least one site first.")
+        return 1
+
+    if args.dry_run:
+        print("\nDry run: no files changed.")
+        return
+
+    C['STRATUM_CUTS'] = ','.join(f'{c:g}' for c in cuts)
+    if weights is not None:
+        apply_settings(C, new_strata, weights, yields)
+    save_constants(C)
+    missing = [s for s in get_strata(C) if f'{s}_WEIGHT' not in C]
+    if missing:
+        print(f"\nWarning: No weights configured for {', '.join(missing)}; add {missing[0]}_WEIGHT etc. to CONSTANTS.txt.")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Shared core for the SPARC-XP recruitment tools (run as `python3 -m sparc <command>`)."""
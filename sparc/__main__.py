@@ -0,0 +1,4 @@
+import sys
+from sparc.cli import main
+
+sys.exit(main())
@@ -0,0 +1,48 @@
+import os
+import pickle
+import shutil
+import hashlib
+
+class Checkpoint:
+    """
+    Phase-boundary checkpoints for one run, kept in SCRATCH_DIR.
+
+    A run is identified by its command, arguments and the size/mtime of its
+    input files, so `--resume` only picks up state written by an interrupted
+    run over the same inputs. Only the latest completed phase is kept; the
+    directory is removed once the run finishes.
+    """
+
+    def __init__(self, scratch_dir, command, key_parts):
+        key = hashlib.md5(repr(key_parts).encode()).hexdigest()[:12]
+        self.dir = os.path.join(scratch_dir, f"{command}_{key}")
+
+    @staticmethod
+    def file_key(path):
+        if not os.path.exists(path):
+            return (path, None)
+        st = os.stat(path)
+        return (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+
+    def resume(self, phases):
+        """Return (phase, state) for the latest completed phase, or (None, None)."""
+        for phase in reversed(phases):
+            path = os.path.join(self.dir, f"{phase}.pkl")
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    return phase, pickle.load(f)
+        return None, None
+
+    def save(self, phase, state):
+        if not os.path.exists(self.dir): os.makedirs(self.dir)
+        path = os.path.join(self.dir, f"{phase}.pkl")
+        with open(path + '.tmp', 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + '.tmp', path)  # atomic: a crash never leaves a partial checkpoint
+        for name in os.listdir(self.dir):
+            if name.endswith('.pkl') and name != f"{phase}.pkl":
+                os.remove(os.path.join(self.dir, name))
+
+    def clear(self):
+        if os.path.exists(self.dir):
+            shutil.rmtree(self.dir)
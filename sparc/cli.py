@@ -0,0 +1,38 @@
+import sys
+import importlib
+
+# AIDEV-NOTE: Keep this module import-light. Each command's module (and its
+# csv/sqlite3/etc. dependencies) is imported only when that command runs.
+COMMANDS = {
+    'ingest': ('update_master', "Ingest a raw site dump into its master list"),
+    'recruit': ('update_recruitment', "Generate the next recruitment batch"),
+    'plan': ('plan_recruitment', "Plan recruitment allocations over several months"),
+    'patch': ('patch_master_list', "Rebuild master lists from a recruitment list"),
+    'restratify': ('restratify', "Reassign strata after a change of cut points"),
+    'consort': ('consort', "Print the recruitment history table"),
+    'status': ('sparc.status', "Summarize master list statuses per site"),
+    'replay': ('sparc.event_log', "Reconstruct a master list at a point in time"),
+}
+
+def usage():
+    lines = ["usage: python3 -m sparc <command> [options]", "", "commands:"]
+    for name, (_, help_text) in COMMANDS.items():
+        lines.append(f"  {name:<10} {help_text}")
+    lines.append("")
+    lines.append("Run 'python3 -m sparc <command> --help' for command options.")
+    return "\n".join(lines)
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ('-h', '--help'):
+        print(usage())
+        return 0
+
+    command, rest = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"Error: Unknown command '{command}'.\n\n{usage()}", file=sys.stderr)
+        return 2
+
+    sys.argv[0] = f"sparc {command}"  # argparse usage/prog lines
+    module = importlib.import_module(COMMANDS[command][0])
+    return module.main(rest)
@@ -0,0 +1,30 @@
+import os
+
+CONSTANTS_FILE = 'CONSTANTS.txt'
+
+def get_constants(path=CONSTANTS_FILE):
+    """
+    Parse CONSTANTS.txt into a dict (numeric values as floats), or None if it is missing.
+
+    Not cached: each command parses the file once per process, and parsing
+    it is cheaper than reading back any on-disk cache of it.
+    """
+    if not os.path.exists(path):
+        return None
+    c = {}
+    with open(path, 'r') as f:
+        for line in f:
+            if '=' in line and not line.startswith('#'):
+                parts = line.strip().split('=')
+                if len(parts) == 2:
+                    k, v = parts
+                    try:
+                        c[k] = float(v)
+                    except ValueError:
+                        c[k] = v
+    return c
+
+def save_constants(c, path=CONSTANTS_FILE):
+    with open(path, 'w') as f:
+        for k, v in c.items():
+            f.write(f"{k}={v}\n")
@@ -0,0 +1,198 @@
+import csv
+import os
+import mmap
+import struct
+from array import array
+from bisect import bisect_left
+
+INDEX_MAGIC = b'SPXIDX2\n'
+_HEADER = struct.Struct('<8sQQQ?')  # magic, file size, mtime_ns, row count, file contains quotes
+_COUNT = struct.Struct('<Q')
+
+def indexed_row_count(path):
+    """Row count from a fresh `<path>.idx` (reads only its header), or None if there is none."""
+    try:
+        st = os.stat(path)
+        with open(path + '.idx', 'rb') as f:
+            magic, size, mtime_ns, count, _ = _HEADER.unpack(f.read(_HEADER.size))
+    except (OSError, struct.error):
+        return None
+    return count if magic == INDEX_MAGIC and (size, mtime_ns) == (st.st_size, st.st_mtime_ns) else None
+
+class MasterReader:
+    """
+    Read-only, memory-mapped view of a master CSV that decodes columns on demand.
+
+    A one-time index is cached next to the file (`<file>.idx`) and rebuilt
+    whenever the file's size or mtime changes. It holds the start offset of
+    every row, whether the file contains quotes, and an MRN -> row table
+    sorted by offspring_MRN. Rows can then be fetched by number or MRN and
+    columns decoded without building a dict per row for every column.
+    Quoted fields, including ones with embedded newlines, are handled;
+    unquoted lines take a plain split fast path.
+
+    Event logs are not applied here; use sparc.event_log.load_master_columns().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        st = os.fstat(self._file.fileno())
+        self._stat = (st.st_size, st.st_mtime_ns)
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if st.st_size else b''
+        header_end = self._mm.find(b'\n')
+        header_end = len(self._mm) if header_end == -1 else header_end + 1
+        self.fieldnames = self._fields(self._mm[:header_end]) if header_end else []
+        self._col = {name: i for i, name in enumerate(self.fieldnames)}
+        self._mrn_table = None  # (sorted MRNs as bytes, matching row numbers), loaded on first find_mrn()
+        self._mrn_pos = None    # Offset of the MRN table in the .idx file
+        self._load_index(header_end)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._file.close()
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    # Index ----------------------------------------------------------------
+
+    def _index_path(self):
+        return self.path + '.idx'
+
+    def _read_header(self, f):
+        """(count, quoted) if the index file matches this master's size and mtime, else None."""
+        magic, size, mtime_ns, count, quoted = _HEADER.unpack(f.read(_HEADER.size))
+        if magic == INDEX_MAGIC and (size, mtime_ns) == self._stat:
+            return count, quoted
+        return None
+
+    def _load_index(self, header_end):
+        try:
+            with open(self._index_path(), 'rb') as f:
+                header = self._read_header(f)
+                if header:
+                    count, quoted = header
+                    offsets = array('Q')
+                    offsets.frombytes(f.read(offsets.itemsize * (count + 1)))
+                    if len(offsets) == count + 1:
+                        self._quoted, self._offsets, self._mrn_pos = quoted, offsets, f.tell()
+                        return
+        except (OSError, struct.error):
+            pass
+
+        self._quoted = self._mm.find(b'"') != -1
+        self._offsets = self._build_index(header_end)
+        self._mrn_table = self._build_mrn_table()
+        mrns, rows = self._mrn_table
+        try:
+            with open(self._index_path() + '.tmp', 'wb') as f:
+                f.write(_HEADER.pack(INDEX_MAGIC, *self._stat, len(self), self._quoted))
+                f.write(self._offsets.tobytes())
+                f.write(_COUNT.pack(len(rows)))
+                f.write(rows.tobytes())
+                f.write(b'\n'.join(mrns))
+            os.replace(self._index_path() + '.tmp', self._index_path())
+        except OSError:
+            pass  # Read-only location: the index is just rebuilt next time
+
+    def _build_index(self, pos):
+        """Start offset of every record, plus the end offset of the last one."""
+        mm = self._mm
+        end = len(mm)
+        offsets = array('Q')
+        while pos < end:
+            start = pos
+            nl = mm.find(b'\n', pos)
+            pos = end if nl == -1 else nl + 1
+            # A record continues while it holds an odd number of quotes (newline inside a quoted field)
+            if self._quoted:
+                quotes = mm[start:pos].count(b'"')
+                while quotes % 2 and pos < end:
+                    nl = mm.find(b'\n', pos)
+                    next_pos = end if nl == -1 else nl + 1
+                    quotes += mm[pos:next_pos].count(b'"')
+                    pos = next_pos
+            if mm[start:pos].strip():  # skip blank lines
+                offsets.append(start)
+        offsets.append(end)
+        return offsets
+
+    def _build_mrn_table(self):
+        """offspring_MRN values sorted (as bytes), with the row number of each."""
+        if 'offspring_MRN' not in self._col:
+            return [], array('Q')
+        pairs = sorted((m.encode(), i) for i, m in enumerate(self.column('offspring_MRN')))
+        return [m for m, _ in pairs], array('Q', (i for _, i in pairs))
+
+    def _read_mrn_table(self):
+        try:
+            with open(self._index_path(), 'rb') as f:
+                # The index may have been rebuilt by another process since it was opened
+                if self._read_header(f) == (len(self), self._quoted):
+                    f.seek(self._mrn_pos)
+                    (n,) = _COUNT.unpack(f.read(_COUNT.size))
+                    rows = array('Q')
+                    rows.frombytes(f.read(rows.itemsize * n))
+                    blob = f.read()
+                    mrns = blob.split(b'\n') if n else []
+                    if len(rows) == len(mrns) == n:
+                        return mrns, rows
+        except (OSError, struct.error):
+            pass
+        return self._build_mrn_table()
+
+    # Decoding ---------------------------------------------------------------
+
+    @staticmethod
+    def _fields(line):
+        text = line.decode()
+        if '"' in text:
+            return next(csv.reader([text]))
+        return text.rstrip('\r\n').split(',')
+
+    def _line(self, i):
+        return self._mm[self._offsets[i]:self._offsets[i + 1]]
+
+    def row(self, i, columns=None):
+        """Row i (0-based, header excluded) as a dict of the requested columns (default: all)."""
+        values = self._fields(self._line(i))
+        if columns is None:
+            return dict(zip(self.fieldnames, values))
+        return {c: values[self._col[c]] if c in self._col and self._col[c] < len(values) else ''
+                for c in columns}
+
+    def columns(self, names):
+        """Yield one tuple per row with just the named columns ('' for columns not in the file)."""
+        idx = [self._col.get(n) for n in names]
+        last = max((i for i in idx if i is not None), default=-1)
+        mm, offsets = self._mm, self._offsets
+        for r in range(len(self)):
+            line = mm[offsets[r]:offsets[r + 1]]
+            if b'"' in line:
+                values = next(csv.reader([line.decode()]))
+            else:
+                # Only split as far as the last requested column
+                values = line.decode().rstrip('\r\n').split(',', last + 1)
+                if len(values) > last + 1:
+                    values.pop()
+            yield tuple(values[i] if i is not None and i < len(values) else '' for i in idx)
+
+    def column(self, name):
+        return [values[0] for values in self.columns([name])]
+
+    def find_mrn(self, mrn):
+        """Row number for an offspring_MRN (binary search of the cached MRN table), or None."""
+        if self._mrn_table is None:
+            self._mrn_table = self._read_mrn_table()
+        mrns, rows = self._mrn_table
+        key = mrn.encode()
+        i = bisect_left(mrns, key)
+        return rows[i] if i < len(mrns) and mrns[i] == key else None
@@ -0,0 +1,194 @@
+import csv
+import os
+import sys
+import shutil
+import argparse
+from datetime import datetime
+
+# AIDEV-NOTE: A master list is its last snapshot CSV plus an append-only event log.
+# Readers must go through load_master() so logged changes are applied.
+EVENT_FIELDS = ['offspring_MRN', 'field', 'old', 'new', 'timestamp', 'run_id']
+TRACKED_FIELDS = ['status', 'letter1_date', 'letter2_date', 'contact_stage',
+                  'last_contact_date', 'date_added_to_recruitment']
+
+def events_path(master_path):
+    """parsed_mgb_master_list.csv -> parsed_mgb_master_list_events.csv"""
+    root, ext = os.path.splitext(master_path)
+    return f"{root}_events{ext}"
+
+def new_run_id():
+    return datetime.now().strftime('%Y%m%d_%H%M%S')
+
+def read_events(path, until=None):
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r') as f:
+        events = list(csv.DictReader(f))
+    if until:
+        if len(until) == 10: until += ' 23:59:59'  # date only: include that whole day
+        events = [e for e in events if e['timestamp'] <= until]
+    return events
+
+def apply_events(rows, events):
+    """Replay events in order onto snapshot rows (in place)."""
+    row_map = {r['offspring_MRN']: r for r in rows}
+    for e in events:
+        r = row_map.get(e['offspring_MRN'])
+        if r is not None:
+            r[e['field']] = e['new']
+    return rows
+
+def master_fieldnames(rows):
+    """Snapshot header: every column found in any row (first-seen order) plus any fields added by events."""
+    fieldnames = {}
+    for r in rows:
+        for f in r:
+            if f not in fieldnames: fieldnames[f] = None
+    for f in TRACKED_FIELDS:
+        if f not in fieldnames: fieldnames[f] = None
+    return list(fieldnames)
+
+def load_master(master_path, until=None, log_path=None, progress=None):
+    """
+    Read a master snapshot and replay its event log.
+
+    `until` (YYYY-MM-DD[ HH:MM:SS]) replays only events up to that time.
+    `log_path` overrides the log location, e.g. an archived log in backups.
+    `progress` is an optional sparc.progress.Progress for the snapshot parse.
+    """
+    with open(master_path, 'r') as f:
+        reader = csv.DictReader(f)
+        rows = list(progress.track(reader) if progress else reader)
+    apply_events(rows, read_events(log_path or events_path(master_path), until))
+    for r in rows:
+        for field in TRACKED_FIELDS:
+            if r.get(field) is None: r[field] = ''
+    return rows
+
+def load_master_columns(master_path, columns):
+    """
+    Read-only, column-projected load_master(): only `columns` (plus
+    offspring_MRN) are decoded, via the memory-mapped MasterReader, and
+    logged changes to those columns are replayed on top.
+    """
+    from sparc.csvindex import MasterReader
+    cols = list(columns) if 'offspring_MRN' in columns else ['offspring_MRN'] + list(columns)
+    with MasterReader(master_path) as reader:
+        rows = [dict(zip(cols, values)) for values in reader.columns(cols)]
+    apply_events(rows, [e for e in read_events(events_path(master_path)) if e['field'] in cols])
+    return rows
+
+def lookup_master_rows(master_path, mrns, columns):
+    """
+    {MRN: row} for the given MRNs with only `columns`, by random access into
+    the master (no full parse) plus any logged changes to those columns.
+    MRNs not in the master are omitted.
+    """
+    from sparc.csvindex import MasterReader
+    found = {}
+    with MasterReader(master_path) as reader:
+        for mrn in mrns:
+            i = reader.find_mrn(mrn)
+            if i is not None:
+                found[mrn] = reader.row(i, columns)
+    for e in read_events(events_path(master_path)):
+        r = found.get(e['offspring_MRN'])
+        if r is not None and e['field'] in r:
+            r[e['field']] = e['new']
+    return found
+
+def capture(rows, fields=TRACKED_FIELDS):
+    """Remember the tracked fields of every row so changes can be logged later."""
+    return {r['offspring_MRN']: tuple(r.get(f) or '' for f in fields) for r in rows}
+
+def record_changes(master_path, before, rows, run_id, fields=TRACKED_FIELDS):
+    """Append one event per field that changed since capture(rows, fields). Returns the count."""
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    events = []
+    for r in rows:
+        old_values = before.get(r['offspring_MRN'])
+        if old_values is None:
+            continue
+        for field, old in zip(fields, old_values):
+            new = r.get(field) or ''
+            if new != old:
+                events.append({'offspring_MRN': r['offspring_MRN'], 'field': field,
+                               'old': old, 'new': new,
+                               'timestamp': timestamp, 'run_id': run_id})
+    if events:
+        log_path = events_path(master_path)
+        write_header = not os.path.exists(log_path)
+        with open(log_path, 'a', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=EVENT_FIELDS)
+            if write_header: writer.writeheader()
+            writer.writerows(events)
+    return len(events)
+
+def _archive_paths(backup_dir, master_path, timestamp):
+    """Unused (snapshot, log) archive paths; a second rewrite with the same timestamp gets a _2, _3 ... suffix."""
+    name = os.path.basename(master_path)
+    log_name = os.path.basename(events_path(master_path))
+    n = 1
+    while True:
+        tag = timestamp if n == 1 else f"{timestamp}_{n}"
+        snapshot = os.path.join(backup_dir, f"{name}_pre_compact_{tag}.csv")
+        log = os.path.join(backup_dir, f"{log_name}_{tag}.csv")
+        if not os.path.exists(snapshot) and not os.path.exists(log):
+            return snapshot, log
+        n += 1
+
+def write_snapshot(master_path, rows, fieldnames, backup_dir, timestamp):
+    """
+    Replace the snapshot with fully-materialized rows and start a fresh log.
+
+    The previous snapshot and its log are archived together in backup_dir so
+    that earlier states can still be replayed; existing archives are never
+    overwritten. `rows` may be any iterable. A row with a column missing
+    from `fieldnames` raises ValueError and leaves the master untouched.
+    """
+    if not os.path.exists(backup_dir): os.makedirs(backup_dir)
+    log_path = events_path(master_path)
+    snapshot_archive, log_archive = _archive_paths(backup_dir, master_path, timestamp)
+
+    # Write aside and swap in atomically: a crash mid-write leaves the old snapshot and its log intact
+    tmp_path = master_path + '.tmp'
+    try:
+        with open(tmp_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+    except ValueError:
+        os.remove(tmp_path)
+        raise
+
+    if os.path.exists(log_path) and os.path.exists(master_path):
+        shutil.copy(master_path, snapshot_archive)
+    os.replace(tmp_path, master_path)
+    if os.path.exists(log_path):
+        shutil.move(log_path, log_archive)
+
+def compact_if_needed(master_path, rows, max_mb, backup_dir, timestamp):
+    """Fold the event log into a new snapshot once it exceeds max_mb. Returns True if compacted."""
+    log_path = events_path(master_path)
+    if not os.path.exists(log_path) or os.path.getsize(log_path) <= max_mb * 1024 * 1024:
+        return False
+    write_snapshot(master_path, rows, master_fieldnames(rows), backup_dir, timestamp)
+    return True
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a master list's event log to reconstruct its state at a point in time")
+    parser.add_argument("master_file", help="Master snapshot CSV (current or a backup)")
+    parser.add_argument("--until", help="Replay events up to this time (YYYY-MM-DD or 'YYYY-MM-DD HH:MM:SS')")
+    parser.add_argument("--events", help="Event log to replay (default: the log next to master_file)")
+    parser.add_argument("--out", required=True, help="Output CSV for the reconstructed master")
+    args = parser.parse_args(argv)
+
+    rows = load_master(args.master_file, until=args.until, log_path=args.events)
+    with open(args.out, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=master_fieldnames(rows))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Reconstructed {len(rows)} rows to {args.out}")
+
+if __name__ == "__main__":
+    sys.exit(main())
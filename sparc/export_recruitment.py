@@ -0,0 +1,86 @@
+import csv
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# AIDEV-NOTE: Recruitment exports are blinded - they exclude model_score, model_pctile, stratum, and diagnosis fields.
+# The sampling still uses stratification internally, but no export reveals stratum assignment.
+BLINDED_FIELDS = ['model_score', 'model_pctile', 'stratum']
+RECRUITMENT_FIELDS = ['date_added_to_recruitment', 'letter1_date', 'letter2_date']
+MAIL_MERGE_FIELDS = ['mother_first', 'mother_last', 'mother_phone',
+                     'offspring_first', 'offspring_last', 'offspring_MRN', 'site']
+
+def blinded_fieldnames(rows):
+    fieldnames = [f for f in rows[0].keys()
+                  if f not in BLINDED_FIELDS and 'diagnosis' not in f.lower()]
+    # Ensure new columns are in output
+    for f in RECRUITMENT_FIELDS:
+        if f not in fieldnames: fieldnames.append(f)
+    return fieldnames
+
+class _Target:
+    """An in-memory CSV for one export file."""
+
+    def __init__(self, path, header):
+        self.path = path
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+        self.writer.writerow(header)
+        self.count = 0
+
+    def add(self, record):
+        self.writer.writerow(record)
+        self.count += 1
+
+def _write(path, data):
+    with open(path, 'w', newline='') as f:
+        f.write(data)
+
+def export_recruitment(rows, output_dir, backup_dir, today_ts, backup_ts, wave_size=0):
+    """
+    Write the blinded recruitment list and its derived exports.
+
+    The blinded column projection is built once and every row is routed in a
+    single pass to the combined list, its per-site list, its mailing-wave list
+    (chunks of `wave_size` in output order; 0 disables waves) and the
+    mail-merge list. The finished buffers are written in parallel, and the
+    backup copy is written from the combined buffer rather than re-read from
+    disk. Returns {path: row count}.
+    """
+    fieldnames = blinded_fieldnames(rows)
+    merge_fields = [f for f in MAIL_MERGE_FIELDS if f in fieldnames]
+    merge_idx = [fieldnames.index(f) for f in merge_fields]
+    base = os.path.join(output_dir, f"recruitment_{today_ts}")
+
+    combined = _Target(f"{base}.csv", fieldnames)
+    mail_merge = _Target(f"{base}_mailmerge.csv", merge_fields)
+    sites = {}
+    waves = {}
+    for i, r in enumerate(rows):
+        record = ['' if r.get(f) is None else r.get(f) for f in fieldnames]
+        combined.add(record)
+        mail_merge.add([record[j] for j in merge_idx])
+
+        site = r.get('site') or 'UNKNOWN'
+        if site not in sites:
+            sites[site] = _Target(f"{base}_{site}.csv", fieldnames)
+        sites[site].add(record)
+
+        if wave_size > 0:
+            wave = i // wave_size + 1
+            if wave not in waves:
+                waves[wave] = _Target(f"{base}_wave{wave}.csv", fieldnames)
+            waves[wave].add(record)
+
+    targets = [combined, mail_merge] + list(sites.values()) + list(waves.values())
+    combined_data = combined.buffer.getvalue()
+    writes = [(t.path, t.buffer.getvalue()) for t in targets[1:]]
+    writes.append((combined.path, combined_data))
+
+    if not os.path.exists(backup_dir): os.makedirs(backup_dir)
+    writes.append((os.path.join(backup_dir, f"recruitment_{today_ts}_{backup_ts}.csv"), combined_data))
+
+    with ThreadPoolExecutor(max_workers=min(len(writes), 8)) as pool:
+        list(pool.map(lambda w: _write(*w), writes))
+
+    return {t.path: t.count for t in targets}
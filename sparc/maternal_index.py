@@ -0,0 +1,116 @@
+import os
+import sqlite3
+import hashlib
+
+INDEX_NAME = 'maternal_index.db'
+
+class BloomFilter:
+    """Fixed-size Bloom filter over string keys (no false negatives)."""
+
+    def __init__(self, n_bits=1 << 20, n_hashes=7, bits=None):
+        self.n_bits = n_bits
+        self.n_hashes = n_hashes
+        self.bits = bytearray(bits) if bits is not None else bytearray(n_bits // 8)
+
+    @classmethod
+    def for_capacity(cls, n_items):
+        # ~10 bits per item with 7 hashes gives a false positive rate under 1%
+        n_bits = 1 << 20
+        while n_bits < n_items * 10:
+            n_bits <<= 1
+        return cls(n_bits=n_bits)
+
+    def _positions(self, key):
+        # Double hashing: derive k bit positions from one 128-bit digest
+        digest = hashlib.md5(key.encode()).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.n_bits for i in range(self.n_hashes)]
+
+    def add(self, key):
+        for p in self._positions(key):
+            self.bits[p >> 3] |= 1 << (p & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+class MaternalIndex:
+    """
+    Persisted cross-site index of offspring keyed on mother_MRN.
+
+    The index lives in OUTPUT_DIR next to the site masters. Each site ingest
+    replaces that site's entries and then queries siblings at the other
+    sites, so the work done is proportional to the rows being ingested
+    rather than to the combined cohort. One Bloom filter per site over
+    mother_MRN sits in front of the SQLite lookup; only the other sites'
+    filters are consulted, so mothers never seen at another site (the common
+    case) cost no database query.
+    """
+
+    def __init__(self, output_dir):
+        if not os.path.exists(output_dir): os.makedirs(output_dir)
+        self.path = os.path.join(output_dir, INDEX_NAME)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value BLOB)")
+        # The same offspring_MRN may legitimately exist at both sites
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS offspring ("
+            "site TEXT NOT NULL, offspring_MRN TEXT NOT NULL, mother_MRN TEXT NOT NULL, "
+            "status TEXT, PRIMARY KEY (site, offspring_MRN))")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_mother ON offspring(mother_MRN)")
+        self.blooms = self._load_blooms()
+
+    def _load_blooms(self):
+        meta = dict(self.conn.execute("SELECT key, value FROM meta").fetchall())
+        blooms = {}
+        for (site,) in self.conn.execute("SELECT DISTINCT site FROM offspring").fetchall():
+            if f'bloom_bits:{site}' in meta:
+                blooms[site] = BloomFilter(n_bits=int(meta[f'bloom_n_bits:{site}']),
+                                           n_hashes=int(meta[f'bloom_n_hashes:{site}']),
+                                           bits=meta[f'bloom_bits:{site}'])
+            else:
+                blooms[site] = self._build_bloom(site)
+        return blooms
+
+    def _build_bloom(self, site):
+        count = self.conn.execute("SELECT COUNT(*) FROM offspring WHERE site = ?", (site,)).fetchone()[0]
+        bloom = BloomFilter.for_capacity(count)
+        for (m_id,) in self.conn.execute(
+                "SELECT DISTINCT mother_MRN FROM offspring WHERE site = ?", (site,)):
+            bloom.add(m_id)
+        return bloom
+
+    def replace_site(self, site, rows):
+        """Replace all entries (and the Bloom filter) for a site with the given master rows."""
+        with self.conn:
+            self.conn.execute("DELETE FROM offspring WHERE site = ?", (site,))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO offspring VALUES (?, ?, ?, ?)",
+                [(site, r['offspring_MRN'], r['mother_MRN'], r.get('status', '')) for r in rows])
+        self.blooms[site] = self._build_bloom(site)
+
+    def update_statuses(self, rows):
+        """Refresh the stored status of rows already in the index."""
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE offspring SET status = ? WHERE site = ? AND offspring_MRN = ?",
+                [(r.get('status', ''), r.get('site', ''), r['offspring_MRN']) for r in rows])
+
+    def siblings_elsewhere(self, m_id, site):
+        """Return [(offspring_MRN, status)] for this mother at sites other than `site`."""
+        if not any(m_id in bloom for other, bloom in self.blooms.items() if other != site):
+            return []
+        return self.conn.execute(
+            "SELECT offspring_MRN, status FROM offspring WHERE mother_MRN = ? AND site != ?",
+            (m_id, site)).fetchall()
+
+    def close(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM meta WHERE key LIKE 'bloom%'")
+            for site, bloom in self.blooms.items():
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                    [(f'bloom_n_bits:{site}', str(bloom.n_bits)),
+                     (f'bloom_n_hashes:{site}', str(bloom.n_hashes)),
+                     (f'bloom_bits:{site}', bytes(bloom.bits))])
+        self.conn.close()
@@ -0,0 +1,63 @@
+import sys
+import time
+
+def _fmt_seconds(s):
+    s = int(s)
+    return f"{s // 3600}:{s % 3600 // 60:02d}:{s % 60:02d}"
+
+class Progress:
+    """
+    Rows processed, rows/sec and ETA for one phase, reported on stderr.
+
+    Nothing is printed for phases that finish within `interval` seconds, so
+    small runs stay quiet; long phases report every `interval` seconds and
+    print a closing line.
+    """
+
+    def __init__(self, phase, total=None, interval=5.0, stream=sys.stderr):
+        self.phase = phase
+        self.total = total
+        self.interval = interval
+        self.stream = stream
+        self.count = 0
+        self.start = time.monotonic()
+        self.last_report = self.start
+        self.reported = False
+
+    def track(self, iterable):
+        for item in iterable:
+            yield item
+            self.count += 1
+            if not self.count & 1023:
+                self._maybe_report()
+        self.finish()
+
+    def update(self, n=1):
+        self.count += n
+        self._maybe_report()
+
+    def _maybe_report(self):
+        now = time.monotonic()
+        if now - self.last_report < self.interval:
+            return
+        self.last_report = now
+        self.reported = True
+        elapsed = now - self.start
+        rate = self.count / elapsed if elapsed else 0.0
+        line = f"[{self.phase}] {self.count:,}"
+        if self.total:
+            line += f"/{self.total:,} rows ({self.count / self.total * 100:.0f}%)"
+        else:
+            line += " rows"
+        line += f", {rate:,.0f} rows/s"
+        if self.total and rate:
+            line += f", ETA {_fmt_seconds(max(self.total - self.count, 0) / rate)}"
+        print(line, file=self.stream, flush=True)
+
+    def finish(self):
+        if self.reported:
+            elapsed = time.monotonic() - self.start
+            rate = self.count / elapsed if elapsed else 0.0
+            print(f"[{self.phase}] done: {self.count:,} rows in {_fmt_seconds(elapsed)} ({rate:,.0f} rows/s)",
+                  file=self.stream, flush=True)
+            self.reported = False
@@ -0,0 +1,99 @@
+import csv
+import os
+
+# Statuses an analyst may enter in a prior list (see README_ANALYST.txt)
+VALID_STATUSES = {'Not Invited', 'Pending', 'invite 1 sent', 'invite 2 sent',
+                  'Completed', 'Refused', 'No Response'}
+IN_PROGRESS_STATUSES = {'Pending', 'invite 1 sent', 'invite 2 sent'}
+CLOSED_STATUSES = {'Refused', 'No Response'}
+
+REPORT_FIELDS = ['offspring_MRN', 'issue', 'detail', 'prior_site', 'master_site',
+                 'current_status', 'new_status']
+ISSUES = ['unknown_mrn', 'wrong_site', 'illegal_transition', 'duplicate']
+
+def transition_problem(old, new):
+    """Why old -> new is not allowed, or None if it is."""
+    if not new or new == old:
+        return None
+    if new not in VALID_STATUSES:
+        return f"unrecognized status '{new}'"
+    if old == 'Completed':
+        return "Completed is final"
+    if new == 'Not Invited':
+        return "cannot return to Not Invited"
+    if old in CLOSED_STATUSES and new in IN_PROGRESS_STATUSES:
+        return f"{old} cannot reopen as {new}"
+    return None
+
+def reconcile_prior_list(prior_rows, site_rows):
+    """
+    Classify every prior-list row against hash indexes of the site masters.
+
+    site_rows is {'MGB': rows, 'VUMC': rows}. The same MRN may exist at
+    both sites: a prior row with a `site` matches only that site's master
+    row, one without matches the MRN at every site holding it. Each result
+    is a dict with the REPORT_FIELDS plus 'rows' (the matching master rows).
+    'issue' is '' when the row can be applied. Only the first occurrence of
+    a (site, MRN) is applied; a later one is flagged as a duplicate, unless
+    it already has another issue, in which case the duplicate is noted in
+    'detail'.
+    """
+    index = {}  # MRN -> {site: row}
+    for site, rows in site_rows.items():
+        for r in rows:
+            index.setdefault(r['offspring_MRN'], {})[site] = r
+
+    results = []
+    seen = set()  # (site, MRN)
+    for p in prior_rows:
+        mrn = p.get('offspring_MRN', '')
+        prior_site = p.get('site', '')
+        new_status = p.get('status', '')
+        by_site = index.get(mrn, {})
+        if prior_site:
+            matched = {prior_site: by_site[prior_site]} if prior_site in by_site else {}
+        else:
+            matched = dict(by_site)
+        result = {'offspring_MRN': mrn, 'issue': '', 'detail': '', 'prior_site': prior_site,
+                  'master_site': ';'.join(matched) or ';'.join(by_site),
+                  'current_status': ';'.join(r['status'] for r in matched.values()),
+                  'new_status': new_status, 'rows': list(matched.values())}
+
+        if not by_site:
+            result['issue'] = 'unknown_mrn'
+            result['detail'] = "MRN not found in any master list"
+        elif not matched:
+            result['issue'] = 'wrong_site'
+            result['detail'] = f"listed as {prior_site}, master list is {';'.join(by_site)}"
+        else:
+            problems = [problem for problem in (transition_problem(r['status'], new_status) for r in matched.values())
+                        if problem]
+            if problems:
+                result['issue'] = 'illegal_transition'
+                result['detail'] = problems[0]
+
+        keys = {(site, mrn) for site in matched} or {(prior_site, mrn)}
+        if keys & seen:
+            if result['issue']:
+                result['detail'] += "; also appears earlier in the prior list"
+            else:
+                result['issue'] = 'duplicate'
+                result['detail'] = "MRN appears earlier in the prior list"
+        seen |= keys
+        results.append(result)
+    return results
+
+def summarize(results):
+    counts = {issue: 0 for issue in ISSUES}
+    for r in results:
+        if r['issue']:
+            counts[r['issue']] += 1
+    return counts
+
+def write_report(results, path):
+    """Write the reconciliation CSV (one line per prior-list row)."""
+    if not os.path.exists(os.path.dirname(path) or '.'): os.makedirs(os.path.dirname(path))
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(results)
@@ -0,0 +1,20 @@
+import os
+import random
+import hashlib
+
+def new_seed():
+    """Fresh 63-bit run seed (recorded in the run's log so the run can be reproduced)."""
+    return int.from_bytes(os.urandom(8), 'big') >> 1
+
+def stream(seed, *labels):
+    """
+    Independent random.Random for one purpose within a run.
+
+    The child seed is a hash of the run seed and the labels (e.g. site and
+    stratum), in the spirit of NumPy's SeedSequence.spawn but keyed by name
+    rather than spawn order. A stream therefore gives the same draws however
+    many other streams exist or in what order (or in which worker) they are
+    used, so a seeded run can be replayed exactly for audit.
+    """
+    key = '|'.join([str(seed)] + [str(label) for label in labels])
+    return random.Random(int.from_bytes(hashlib.sha256(key.encode()).digest()[:8], 'big'))
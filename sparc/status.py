@@ -0,0 +1,33 @@
+import os
+import argparse
+from sparc.constants import get_constants
+from sparc.event_log import load_master_columns
+
+MASTER_LISTS = [('MGB', 'parsed_mgb_master_list.csv'), ('VUMC', 'parsed_vumc_master_list.csv')]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize master list statuses per site")
+    parser.parse_args(argv)
+
+    C = get_constants()
+    output_dir = C.get('OUTPUT_DIR', 'study_data/outputs')
+
+    found = False
+    for site, name in MASTER_LISTS:
+        path = os.path.join(output_dir, name)
+        if not os.path.exists(path):
+            continue
+        found = True
+        rows = load_master_columns(path, ['status', 'eligible'])
+        counts = {}
+        for r in rows:
+            counts[r['status']] = counts.get(r['status'], 0) + 1
+        available = sum(1 for r in rows if r['status'] == 'Not Invited' and r['eligible'] == '1')
+
+        print(f"{site}: {len(rows)} offspring, {available} eligible and not invited")
+        for status, n in sorted(counts.items()):
+            print(f"  {status:<15} {n}")
+
+    if not found:
+        print("No master lists found. Run update_master.py for at least one site first.")
+        return 1
@@ -0,0 +1,55 @@
+from bisect import bisect_left
+
+# Percentile cut points, highest first: S1 is P > 95.0, ..., S6 is P <= 10.0
+DEFAULT_CUTS = [95.0, 90.0, 80.0, 50.0, 10.0]
+
+def parse_cuts(value):
+    """'95,90,80,50,10' (or a single number) -> [95.0, 90.0, 80.0, 50.0, 10.0]"""
+    if isinstance(value, float):
+        return [value]
+    cuts = sorted((float(v) for v in str(value).split(',') if v.strip()), reverse=True)
+    if len(set(cuts)) != len(cuts):
+        raise ValueError(f"Duplicate stratum cut points: {value}")
+    return cuts
+
+def get_cut_points(constants):
+    """Cut points from STRATUM_CUTS in CONSTANTS.txt (defaults to the original 95/90/80/50/10)."""
+    if constants and 'STRATUM_CUTS' in constants:
+        return parse_cuts(constants['STRATUM_CUTS'])
+    return list(DEFAULT_CUTS)
+
+def get_strata(constants):
+    """Stratum labels for the configured cut points: S1 .. S(n_cuts + 1)."""
+    return [f'S{i}' for i in range(1, len(get_cut_points(constants)) + 2)]
+
+def describe_bands(cuts):
+    """{'S1': 'P > 95', 'S2': '90 < P <= 95', ..., 'S6': 'P <= 10'} for a cut-point table."""
+    cuts = sorted(cuts, reverse=True)
+    bands = {'S1': f'P > {cuts[0]:g}'}
+    for i in range(1, len(cuts)):
+        bands[f'S{i + 1}'] = f'{cuts[i]:g} < P <= {cuts[i - 1]:g}'
+    bands[f'S{len(cuts) + 1}'] = f'P <= {cuts[-1]:g}'
+    return bands
+
+class Stratifier:
+    """
+    Exact percentile -> stratum assignment for an arbitrary cut-point table.
+
+    Strata are right-closed like the original if-chain (S1 is P > cuts[0]),
+    found with one bisect over the ascending cut points.
+    """
+
+    def __init__(self, cuts):
+        self.ascending = sorted(cuts)
+        self.labels = [f'S{i}' for i in range(len(cuts) + 1, 0, -1)]  # index = number of cuts below P
+
+    def __call__(self, pctile):
+        """Raises ValueError if pctile is not a number."""
+        p = float(pctile)
+        if p != p:
+            raise ValueError("model_pctile is NaN")
+        return self.labels[bisect_left(self.ascending, p)]
+
+    @property
+    def lowest(self):
+        return self.labels[0]
@@ -1,32 +1,17 @@
 import csv
-import random
 import os
 import shutil
 import sys
 import hashlib
 import argparse
 from datetime import datetime
-
-def get_constants():
-    c = {}
-    if not os.path.exists('CONSTANTS.txt'):
-        return None
-    with open('CONSTANTS.txt', 'r') as f:
-        for line in f:
-            if '=' in line and not line.startswith('#'):
-                parts = line.strip().split('=')
-                if len(parts) == 2:
-                    k, v = parts
-                    try:
-                        c[k] = float(v)
-                    except ValueError:
-                        c[k] = v
-    return c
-
-def save_constants(c):
-    with open('CONSTANTS.txt', 'w') as f:
-        for k, v in c.items():
-            f.write(f"{k}={v}\n")
+from sparc.constants import get_constants, save_constants
+from sparc.event_log import load_master, write_snapshot, events_path, master_fieldnames
+from sparc.progress import Progress
+from sparc.csvindex import indexed_row_count
+from sparc.checkpoint import Checkpoint
+from sparc.strata import Stratifier, get_cut_points, get_strata
+from sparc.rng import new_seed, stream
 
 def calculate_age(dob_str):
     try:
@@ -36,41 +21,41 @@ def calculate_age(dob_str):
     except:
         return 0.0
 
-def get_stratum(pctile):
+def get_stratum(pctile, stratify):
+    """Stratum for a model percentile, or None if it cannot be parsed."""
     try:
-        p = float(pctile)
-        if p > 95.0: return 'S1'
-        if p > 90.0: return 'S2'
-        if p > 80.0: return 'S3'
-        if p > 50.0: return 'S4'
-        if p > 10.0: return 'S5'
-        return 'S6'
-    except:
-        return 'S6'
+        return stratify(pctile)
+    except (ValueError, TypeError):
+        return None
 
 def generate_integrity_hash(row):
     # Combines key identity fields into a single string to detect row-shifts
     base_string = f"{row['offspring_MRN']}|{row['offspring_DOB']}|{row['stratum']}"
     return hashlib.md5(base_string.encode()).hexdigest()[:8]
 
-def update_maternal_flags(rows):
+def update_maternal_flags(rows, index=None, site=None, progress=None):
     maternal_map = {}
     for r in rows:
         m_id = r['mother_MRN']
         if m_id not in maternal_map: maternal_map[m_id] = []
-        maternal_map[m_id].append(r)
+        maternal_map[m_id].append((r['offspring_MRN'], r['status']))
 
-    for r in rows:
+    # Siblings already registered at the other site(s), looked up once per mother
+    if index is not None:
+        for m_id, offspring in maternal_map.items():
+            offspring.extend(index.siblings_elsewhere(m_id, site))
+
+    for r in (progress.track(rows) if progress else rows):
         m_id = r['mother_MRN']
         r['multiple_offspring'] = 'Yes' if len(maternal_map[m_id]) > 1 else 'No'
         r['prev_maternal_enrollment'] = 'Yes' if any(
-            o['status'] == 'Completed' and o['offspring_MRN'] != r['offspring_MRN'] 
-            for o in maternal_map[m_id]
+            status == 'Completed' and o_mrn != r['offspring_MRN']
+            for o_mrn, status in maternal_map[m_id]
         ) else 'No'
     return rows
 
-def trim_by_stratum(rows, target_n, constants):
-    """Downsample rows to target_n using configured stratum weights."""
+def trim_by_stratum(rows, target_n, constants, seed, site):
+    """Downsample rows to target_n using configured stratum weights (reproducible for a given seed)."""
     # Only consider eligible rows for trimming
     eligible_rows = [r for r in rows if r.get('eligible') == '1']
     ineligible_rows = [r for r in rows if r.get('eligible') != '1']
@@ -80,7 +65,7 @@ def trim_by_stratum(rows, target_n, constants):
         return rows
 
     # Get configured weights from CONSTANTS
-    strata = ['S1', 'S2', 'S3', 'S4', 'S5', 'S6']
+    strata = get_strata(constants)
     weights = {s: constants.get(f'{s}_WEIGHT', 0.1) for s in strata}
 
     # Normalize weights to sum to 1.0
@@ -90,7 +75,7 @@ def trim_by_stratum(rows, target_n, constants):
     # Count available rows per stratum
     strata_available = {}
     for r in eligible_rows:
-        s = r.get('stratum', 'S6')
+        s = r.get('stratum', strata[-1])
         strata_available[s] = strata_available.get(s, 0) + 1
 
     # Calculate target counts per stratum using configured weights
@@ -119,7 +104,7 @@ def trim_by_stratum(rows, target_n, constants):
             actual_total += available
             shortfall += s_target - available
         else:
-            sampled_rows.extend(random.sample(s_rows, s_target))
+            sampled_rows.extend(stream(seed, site, 'trim', s).sample(s_rows, s_target))
             actual_total += s_target
 
     # If there was a shortfall, try to fill from other strata proportionally
@@ -127,7 +112,7 @@ def trim_by_stratum(rows, target_n, constants):
         remaining_eligible = [r for r in eligible_rows if r not in sampled_rows]
         if remaining_eligible:
             fill_count = min(shortfall, len(remaining_eligible))
-            sampled_rows.extend(random.sample(remaining_eligible, fill_count))
+            sampled_rows.extend(stream(seed, site, 'trim', 'fill').sample(remaining_eligible, fill_count))
             print(f"  Note: {shortfall} shortfall in target strata, filled {fill_count} from others")
 
     print(f"Trimmed from {len(eligible_rows)} to {len(sampled_rows)} eligible rows (target: {target_n})")
@@ -143,12 +128,16 @@ def trim_by_stratum(rows, target_n, constants):
     return sampled_rows + ineligible_rows
 
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Update master list from raw site data")
     parser.add_argument("input_file", help="Input CSV file (must start with 'mgb_' or 'vumc_')")
     parser.add_argument("--trim", type=int, metavar="N",
                         help="After excluding ineligible, downsample to N rows while maintaining stratum distribution")
-    args = parser.parse_args()
+    parser.add_argument("--seed", type=int,
+                        help="Random seed for rand_num and --trim sampling (default: fresh seed, logged)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Resume an interrupted run over the same inputs from its last completed phase")
+    args = parser.parse_args(argv)
 
     input_file = args.input_file
     filename = os.path.basename(input_file)
@@ -161,7 +150,10 @@ def main():
         master_list_name = 'parsed_vumc_master_list.csv'
     else:
         print("Error: Input file must start with 'mgb_' or 'vumc_'.")
-        return
+        return 1
+    if not os.path.exists(input_file):
+        print(f"Error: Input file {input_file} not found.")
+        return 1
 
     C = get_constants()
     output_dir = C.get('OUTPUT_DIR', 'study_data/outputs')
@@ -171,80 +163,138 @@ def main():
     today_str = datetime.now().strftime('%Y-%m-%d')
     timestamp = datetime.now().strftime('%Y%m%d_%H%M')
 
-    # Backup ingested file
-    if not os.path.exists(backup_dir): os.makedirs(backup_dir)
-    shutil.copy(input_file, os.path.join(backup_dir, f"{filename}_{timestamp}.csv"))
-
-    existing_rows = []
-    if os.path.exists(master_list_path):
-        ans = input(f"{master_list_name} already exists. Do you want to update it? [Y/N]: ")
-        if ans.lower() != 'y':
-            print("Aborted.")
-            return
-        
-        # Backup prior version
-        shutil.copy(master_list_path, os.path.join(backup_dir, f"{master_list_name}_{timestamp}.csv"))
-        
-        with open(master_list_path, 'r') as f:
-            existing_rows = list(csv.DictReader(f))
-
-    existing_map = {r['offspring_MRN']: r for r in existing_rows}
-    
-    with open(input_file, 'r') as f:
-        new_data = list(csv.DictReader(f))
-
-    new_mrns = {r['offspring_MRN'] for r in new_data}
-    
-    final_rows = []
-    added_count = 0
-    removed_count = 0
-
-    # Process new and updated records
-    for row in new_data:
-        mrn = row['offspring_MRN']
-        if mrn in existing_map:
-            # Keep existing record, maybe update some fields? 
-            # Instructions say: "we do not change the date_added for existing entries"
-            # and "only add the people where their offspring_MRN value was not previously present"
-            # This implies we keep the OLD record if it exists.
-            final_rows.append(existing_map[mrn])
-        else:
-            # New record
+    # AIDEV-NOTE: State is checkpointed after each phase; --resume restarts after the last completed one
+    phases = ['parsed', 'derived', 'merged', 'trimmed', 'flagged']
+    checkpoint = Checkpoint(C.get('SCRATCH_DIR', 'study_data/scratch'), 'update_master',
+                            (Checkpoint.file_key(input_file), Checkpoint.file_key(master_list_path),
+                             Checkpoint.file_key(events_path(master_list_path)), args.trim))
+    phase, state = checkpoint.resume(phases) if args.resume else (None, None)
+    if phase:
+        print(f"Resuming after phase '{phase}'.")
+    else:
+        if args.resume:
+            print("No checkpoint found for these inputs; starting from the beginning.")
+        checkpoint.clear()
+
+    if phase is None:
+        # Backup ingested file
+        if not os.path.exists(backup_dir): os.makedirs(backup_dir)
+        shutil.copy(input_file, os.path.join(backup_dir, f"{filename}_{timestamp}.csv"))
+
+        existing_rows = []
+        if os.path.exists(master_list_path):
+            ans = input(f"{master_list_name} already exists. Do you want to update it? [Y/N]: ")
+            if ans.lower() != 'y':
+                print("Aborted.")
+                return 1
+
+            # Backup prior version
+            shutil.copy(master_list_path, os.path.join(backup_dir, f"{master_list_name}_{timestamp}.csv"))
+
+            existing_rows = load_master(master_list_path,
+                                        progress=Progress('parse master', total=indexed_row_count(master_list_path)))
+
+        with open(input_file, 'r') as f:
+            new_data = list(Progress('parse input').track(csv.DictReader(f)))
+
+        state = {'seed': args.seed if args.seed is not None else new_seed(),
+                 'existing_rows': existing_rows, 'new_data': new_data,
+                 'prev_offspring': len(existing_rows),
+                 'prev_mothers': len(set(r['mother_MRN'] for r in existing_rows))}
+        phase = 'parsed'
+        checkpoint.save(phase, state)
+
+    if phase == 'parsed':
+        existing_mrns = {r['offspring_MRN'] for r in state['existing_rows']}
+        stratify = Stratifier(get_cut_points(C))
+        rand_stream = stream(state['seed'], site, 'rand_num')
+        added_count = 0
+        unparsed_count = 0
+
+        # Derive fields for new records only
+        # Instructions say: "we do not change the date_added for existing entries"
+        # and "only add the people where their offspring_MRN value was not previously present"
+        for row in Progress('derive', total=len(state['new_data'])).track(state['new_data']):
+            mrn = row['offspring_MRN']
+            if mrn in existing_mrns:
+                continue
             row['date_added'] = today_str
             row['status'] = 'Not Invited'
             row['current_age'] = round(calculate_age(row['offspring_DOB']), 2)
             row['eligible'] = '1' if C['AGE_MIN'] <= float(row['current_age']) < C['AGE_MAX'] else '0'
-            row['stratum'] = get_stratum(row['model_pctile'])
+            row['stratum'] = get_stratum(row['model_pctile'], stratify)
+            if row['stratum'] is None:
+                # AIDEV-NOTE: Unparseable percentiles go to the lowest stratum, but are reported
+                row['stratum'] = stratify.lowest
+                unparsed_count += 1
             row['contact_stage'] = '-1'
             row['last_contact_date'] = ''
-            row['rand_num'] = random.random()
+            row['rand_num'] = rand_stream.random()
             row['integrity_hash'] = generate_integrity_hash(row)
             row['verification_MRN'] = mrn
             row['site'] = site
-            final_rows.append(row)
             added_count += 1
 
-    # Handle removals
-    for mrn, row in existing_map.items():
-        if mrn not in new_mrns:
-            if row['status'] != 'Not Invited':
-                # Keep them if they have been invited
-                final_rows.append(row)
-            else:
-                # Remove them
-                removed_count += 1
+        if unparsed_count:
+            print(f"Warning: {unparsed_count} new rows had an unparseable model_pctile; assigned to {stratify.lowest}.")
+        state['added_count'] = added_count
+        phase = 'derived'
+        checkpoint.save(phase, state)
 
-    final_rows = update_maternal_flags(final_rows)
+    if phase == 'derived':
+        existing_map = {r['offspring_MRN']: r for r in state['existing_rows']}
+        new_mrns = {r['offspring_MRN'] for r in state['new_data']}
 
-    # Apply trim if requested
-    if args.trim:
-        final_rows = trim_by_stratum(final_rows, args.trim, C)
-        # Re-run maternal flags after trimming since some mothers may have lost offspring
-        final_rows = update_maternal_flags(final_rows)
+        final_rows = []
+        removed_count = 0
+
+        # Process new and updated records
+        for row in Progress('merge', total=len(state['new_data'])).track(state['new_data']):
+            # This implies we keep the OLD record if it exists.
+            final_rows.append(existing_map.get(row['offspring_MRN'], row))
+
+        # Handle removals
+        for mrn, row in existing_map.items():
+            if mrn not in new_mrns:
+                if row['status'] != 'Not Invited':
+                    # Keep them if they have been invited
+                    final_rows.append(row)
+                else:
+                    # Remove them
+                    removed_count += 1
+
+        state = {'seed': state['seed'], 'final_rows': final_rows, 'added_count': state['added_count'],
+                 'removed_count': removed_count, 'prev_offspring': state['prev_offspring'],
+                 'prev_mothers': state['prev_mothers']}
+        phase = 'merged'
+        checkpoint.save(phase, state)
+
+    if phase == 'merged':
+        # Apply trim if requested
+        if args.trim:
+            state['final_rows'] = trim_by_stratum(state['final_rows'], args.trim, C, state['seed'], site)
+        phase = 'trimmed'
+        checkpoint.save(phase, state)
+
+    final_rows = state['final_rows']
+    if phase == 'trimmed':
+        # Register this site's rows in the cross-site maternal index, then flag
+        # siblings and prior enrollments across all sites (after trimming, since
+        # some mothers may have lost offspring)
+        # AIDEV-NOTE: Flags on the other site's master are refreshed on its next ingest
+        from sparc.maternal_index import MaternalIndex  # lazy: pulls in sqlite3
+        index = MaternalIndex(output_dir)
+        index.replace_site(site, final_rows)
+        final_rows = update_maternal_flags(final_rows, index=index, site=site,
+                                           progress=Progress('flag', total=len(final_rows)))
+        index.close()
+        phase = 'flagged'
+        checkpoint.save(phase, state)
 
     # Fieldnames
     if final_rows:
-        fieldnames = list(final_rows[0].keys())
+        # Union of all rows' columns: new rows lack fields that existing rows carry (e.g. date_added_to_recruitment)
+        fieldnames = master_fieldnames(final_rows)
         # Ensure all necessary fields are present
         required_fields = ['date_added', 'status', 'current_age', 'eligible', 'stratum', 
                            'contact_stage', 'last_contact_date', 'rand_num', 
@@ -259,25 +309,37 @@ def main():
             for f in required_fields:
                 if f not in row: row[f] = ''
             
-        with open(master_list_path, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(final_rows)
+        # Full rewrite: the event log is folded into this snapshot and archived
+        if not os.path.exists(backup_dir): os.makedirs(backup_dir)
+        write_snapshot(master_list_path, Progress('write', total=len(final_rows)).track(final_rows),
+                       fieldnames, backup_dir, timestamp)
         
         # Backup new version
         shutil.copy(master_list_path, os.path.join(backup_dir, f"{master_list_name}_new_{timestamp}.csv"))
+    checkpoint.clear()
 
     # Stats
-    prev_offspring = len(existing_rows)
-    prev_mothers = len(set(r['mother_MRN'] for r in existing_rows))
+    prev_offspring = state['prev_offspring']
+    prev_mothers = state['prev_mothers']
+    added_count = state['added_count']
+    removed_count = state['removed_count']
     curr_offspring = len(final_rows)
     curr_mothers = len(set(r['mother_MRN'] for r in final_rows))
     
-    print(f"\nUpdate Summary for {site}:")
-    print(f"Previous: {prev_offspring} offspring, {prev_mothers} mothers")
-    print(f"Updated:  {curr_offspring} offspring, {curr_mothers} mothers")
-    print(f"Added:    {added_count}")
-    print(f"Removed:  {removed_count}")
+    summary = [f"\nUpdate Summary for {site}:",
+               f"Previous: {prev_offspring} offspring, {prev_mothers} mothers",
+               f"Updated:  {curr_offspring} offspring, {curr_mothers} mothers",
+               f"Added:    {added_count}",
+               f"Removed:  {removed_count}",
+               f"Seed:     {state['seed']}"]
+    print("\n".join(summary))
+
+    # Logging (the seed reproduces rand_num and --trim sampling with --seed)
+    log_dir = C.get('LOG_DIR', 'study_data/logs')
+    if not os.path.exists(log_dir): os.makedirs(log_dir)
+    with open(os.path.join(log_dir, f"master_{datetime.now().strftime('%Y%m%d')}.log"), 'a') as f:
+        f.write(f"Master Update - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ({input_file}, trim={args.trim})"
+                + "\n".join(summary) + "\n")
 
     # Update CONSTANTS
     if 'START_DATE' not in C:
@@ -286,4 +348,4 @@ def main():
     save_constants(C)
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
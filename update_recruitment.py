@@ -1,32 +1,46 @@
 import csv
-import random
 import os
-import shutil
 import sys
 import argparse
 from datetime import datetime
-
-def get_constants():
-    c = {}
-    if not os.path.exists('CONSTANTS.txt'):
-        return None
-    with open('CONSTANTS.txt', 'r') as f:
-        for line in f:
-            if '=' in line and not line.startswith('#'):
-                parts = line.strip().split('=')
-                if len(parts) == 2:
-                    k, v = parts
-                    try:
-                        c[k] = float(v)
-                    except ValueError:
-                        c[k] = v
-    return c
-
-def save_csv(data, fieldnames, filename):
-    with open(filename, 'w', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
-        writer.writeheader()
-        writer.writerows(data)
+from sparc.constants import get_constants
+from sparc.event_log import load_master, capture, record_changes, compact_if_needed, new_run_id, events_path
+from sparc.progress import Progress
+from sparc.csvindex import indexed_row_count
+from sparc.checkpoint import Checkpoint
+from sparc.strata import get_strata
+from sparc.rng import new_seed, stream
+from sparc.reconcile import reconcile_prior_list, summarize, write_report
+
+def persist_master_changes(master_path, before, rows, run_id, constants, backup_dir):
+    """
+    Append changed status/letter/contact fields to the master's event log
+    instead of rewriting the whole master; compact once the log grows past
+    EVENT_LOG_MAX_MB.
+    """
+    n_events = record_changes(master_path, before, rows, run_id)
+    max_mb = float(constants.get('EVENT_LOG_MAX_MB', 5.0))
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M')
+    if compact_if_needed(master_path, rows, max_mb, backup_dir, timestamp):
+        print(f"Compacted event log into {os.path.basename(master_path)}")
+    return n_events
+
+def master_file_keys(*master_paths):
+    """Size/mtime of each master snapshot and its event log, to detect outside changes before --resume."""
+    return [(Checkpoint.file_key(p), Checkpoint.file_key(events_path(p))) for p in master_paths]
+
+def allocate_targets(total, weights):
+    """Split an integer total across strata by normalized weights (Largest Remainder Method)."""
+    float_targets = {s: total * w for s, w in weights.items()}
+    floor_targets = {s: int(v) for s, v in float_targets.items()}
+    remainder = total - sum(floor_targets.values())
+
+    # Sort by fractional part descending and distribute the remainder
+    fractional_parts = {s: v - int(v) for s, v in float_targets.items()}
+    sorted_strata = sorted(fractional_parts.keys(), key=lambda k: fractional_parts[k], reverse=True)
+    for i in range(remainder):
+        floor_targets[sorted_strata[i]] += 1
+    return floor_targets
 
 def get_yield(rows, stratum, site=None, constants=None):
     """
@@ -58,13 +72,96 @@ def get_yield(rows, stratum, site=None, constants=None):
 
     return 0.1  # Hard-coded default if nothing else specified
 
-def main():
+def select_site(site, rows, site_new_needed, strata, weights, constants, log_messages, seed, progress=None):
+    """
+    Stratified random selection of fresh invites for one site; marks selected rows Pending.
+
+    Each stratum samples from its own stream derived from the run seed, so a
+    site's selection depends only on the seed and that site's rows and can be
+    computed independently of (or in parallel with) the other site.
+    """
+    # Calculate yield per stratum (uses site-specific overrides from CONSTANTS if available)
+    yields = {s: get_yield(rows, s, site=site, constants=constants) for s in strata}
+
+    # Adjust weights based on yield: W_s' = W_s / Yield_s
+    adjusted_weights = {s: weights[s] / yields[s] for s in strata}
+    total_adj_w = sum(adjusted_weights.values())
+    normalized_weights = {s: adjusted_weights[s] / total_adj_w for s in strata}
+
+    floor_targets = allocate_targets(site_new_needed, normalized_weights)
+
+    # Eligible, uninvited rows per stratum in one pass (master order preserved)
+    eligible_by_stratum = {s: [] for s in strata}
+    for r in (progress.track(rows) if progress else rows):
+        if r['status'] == 'Not Invited' and r['eligible'] == '1' and r['stratum'] in eligible_by_stratum:
+            eligible_by_stratum[r['stratum']].append(r)
+
+    # Select participants with cascade logic for shortfalls
+    # AIDEV-NOTE: If a stratum can't meet its target, the shortfall cascades to the next stratum
+    carryover = 0  # Shortfall from previous strata
+    site_selections = []
+
+    for idx, s in enumerate(strata):
+        original_target = floor_targets[s]
+        s_target = original_target + carryover  # Add any carryover from previous strata
+
+        eligible_rows = eligible_by_stratum[s]
+        available = len(eligible_rows)
+
+        # Log the target info
+        if carryover > 0:
+            log_messages.append(f"  {s}: Yield={yields[s]:.2f}, Base Target={original_target}, +Cascade={carryover}, Total Target={s_target}, Available={available}")
+        else:
+            log_messages.append(f"  {s}: Yield={yields[s]:.2f}, Target Invites={s_target}, Available={available}")
+
+        selected = []
+        if available <= s_target:
+            # Take all available, calculate new shortfall
+            selected = eligible_rows
+            shortfall = s_target - available
+            if shortfall > 0 and idx < len(strata) - 1:
+                next_stratum = strata[idx + 1]
+                log_messages.append(f"    WARNING: Ran out of {s}, shifting {shortfall} to {next_stratum}")
+                carryover = shortfall
+            elif shortfall > 0:
+                log_messages.append(f"    WARNING: Ran out of {s}, {shortfall} unfilled (no more strata)")
+                carryover = 0
+            else:
+                carryover = 0
+        else:
+            selected = stream(seed, site, s).sample(eligible_rows, s_target)
+            carryover = 0  # Met target, no carryover
+
+        for r in selected:
+            r['status'] = 'Pending'
+            r['last_contact_date'] = datetime.now().strftime('%Y-%m-%d')
+            r['date_added_to_recruitment'] = datetime.now().strftime('%Y-%m-%d')
+            r['letter1_date'] = '' # Initialize blank
+            r['letter2_date'] = '' # Initialize blank
+            site_selections.append(r)
+
+        log_messages.append(f"    Added: {len(selected)}")
+
+    # Final summary for this site
+    unfilled = site_new_needed - len(site_selections)
+    log_messages.append(f"  SITE SUMMARY: Target={site_new_needed}, Selected={len(site_selections)}, Unfilled={unfilled}")
+    return site_selections
+
+def main(argv=None):
     parser = argparse.ArgumentParser()
     parser.add_argument("--visits", type=int, required=True)
     parser.add_argument("--prior_list", type=str)
     parser.add_argument("--allow-single-site", action="store_true",
                         help="Allow running with only one site's master file present")
-    args = parser.parse_args()
+    parser.add_argument("--wave-size", type=int, default=0, metavar="N",
+                        help="Also split the recruitment list into mailing waves of N rows")
+    parser.add_argument("--seed", type=int,
+                        help="Random seed for selection (default: fresh seed, recorded in the log); reuse it to reproduce a batch")
+    parser.add_argument("--reject-on-anomaly", action="store_true",
+                        help="Abort without changing any master list if the prior list reconciliation flags any row")
+    parser.add_argument("--resume", action="store_true",
+                        help="Resume an interrupted run with the same arguments from its last completed phase")
+    args = parser.parse_args(argv)
 
     C = get_constants()
     output_dir = C.get('OUTPUT_DIR', 'study_data/outputs')
@@ -79,7 +176,7 @@ def main():
 
     if not mgb_exists and not vumc_exists:
         print("Error: No master lists found. Run update_master.py for at least one site first.")
-        return
+        return 1
 
     if not (mgb_exists and vumc_exists):
         missing_site = "MGB" if not mgb_exists else "VUMC"
@@ -87,202 +184,182 @@ def main():
         if not args.allow_single_site:
             print(f"Warning: Only {present_site} master list found. {missing_site} master list is missing.")
             print("Use --allow-single-site to proceed with a single site.")
-            return
+            return 1
         else:
             print(f"Note: Running with {present_site} only (--allow-single-site enabled).")
 
-    mgb_rows = []
-    vumc_rows = []
-    if mgb_exists:
-        with open(mgb_path, 'r') as f:
-            mgb_rows = list(csv.DictReader(f))
-    if vumc_exists:
-        with open(vumc_path, 'r') as f:
-            vumc_rows = list(csv.DictReader(f))
-
-    # Handle Prior List
-    if not args.prior_list:
-        ans = input("There is no prior list provided, do you want to proceed? [Y/N]: ")
-        if ans.lower() != 'y':
-            sys.exit()
+    # AIDEV-NOTE: State is checkpointed after each phase; --resume restarts after the last completed one.
+    # The checkpoint records the masters and event logs as this run left them; if anything else
+    # changed them since (ingest, patch, restratify, another recruit), resuming is refused.
+    phases = ['parsed', 'merged', 'selected']
+    checkpoint = Checkpoint(C.get('SCRATCH_DIR', 'study_data/scratch'), 'update_recruitment',
+                            (args.visits, args.prior_list and Checkpoint.file_key(args.prior_list),
+                             args.allow_single_site, args.wave_size))
+    phase, state = checkpoint.resume(phases) if args.resume else (None, None)
+    if phase:
+        if state.get('master_keys') != master_file_keys(mgb_path, vumc_path):
+            print("Error: The master lists changed since the interrupted run was checkpointed; "
+                  "its saved rows are stale. Re-run without --resume.")
+            return 1
+        print(f"Resuming after phase '{phase}'.")
     else:
-        if os.path.exists(args.prior_list):
+        if args.resume:
+            print("No checkpoint found for these arguments; starting from the beginning.")
+        checkpoint.clear()
+
+    if phase is None:
+        # Handle Prior List
+        if not args.prior_list:
+            ans = input("There is no prior list provided, do you want to proceed? [Y/N]: ")
+            if ans.lower() != 'y':
+                return 1
+        elif not os.path.exists(args.prior_list):
+            print(f"Error: Prior list {args.prior_list} not found.")
+            return 1
+
+        mgb_rows = []
+        vumc_rows = []
+        if mgb_exists:
+            mgb_rows = load_master(mgb_path, progress=Progress('parse MGB master', total=indexed_row_count(mgb_path)))
+        if vumc_exists:
+            vumc_rows = load_master(vumc_path, progress=Progress('parse VUMC master', total=indexed_row_count(vumc_path)))
+
+        state = {'run_id': new_run_id(), 'seed': args.seed if args.seed is not None else new_seed(),
+                 'mgb_rows': mgb_rows, 'vumc_rows': vumc_rows}
+        phase = 'parsed'
+        state['master_keys'] = master_file_keys(mgb_path, vumc_path)
+        checkpoint.save(phase, state)
+
+    run_id = state['run_id']
+    seed = state['seed']
+    mgb_rows = state['mgb_rows']
+    vumc_rows = state['vumc_rows']
+
+    if phase == 'parsed':
+        if args.prior_list:
+            mgb_before = capture(mgb_rows)
+            vumc_before = capture(vumc_rows)
             with open(args.prior_list, 'r') as f:
                 prior_rows = list(csv.DictReader(f))
-            
-            # Create maps for quick lookup of updates
-            # We update status, letter1_date, letter2_date
-            prior_map = {r['offspring_MRN']: r for r in prior_rows}
-            
-            def update_rows(rows, p_map):
-                for r in rows:
-                    mrn = r['offspring_MRN']
-                    if mrn in p_map:
-                        p_row = p_map[mrn]
-                        if 'status' in p_row and p_row['status']:
-                            r['status'] = p_row['status']
-                        if 'letter1_date' in p_row:
-                            r['letter1_date'] = p_row['letter1_date']
-                        if 'letter2_date' in p_row:
-                            r['letter2_date'] = p_row['letter2_date']
-
-            update_rows(mgb_rows, prior_map)
-            update_rows(vumc_rows, prior_map)
-
-            # Save updated master lists
+
+            # Classify every prior-list row against indexes of both masters before touching them
+            results = reconcile_prior_list(prior_rows, {'MGB': mgb_rows, 'VUMC': vumc_rows})
+            report_path = os.path.join(output_dir, f"reconciliation_{datetime.now().strftime('%Y%m%d_%H%M')}.csv")
+            write_report(results, report_path)
+            counts = summarize(results)
+            n_flagged = sum(counts.values())
+            print(f"Prior list reconciliation: {len(results) - n_flagged} OK, {n_flagged} flagged "
+                  f"({', '.join(f'{issue}={n}' for issue, n in counts.items())}). Report: {report_path}")
+            if n_flagged and args.reject_on_anomaly:
+                print("Error: Prior list rejected (--reject-on-anomaly). No master list was changed.")
+                checkpoint.clear()
+                return 1
+
+            # We update status, letter1_date, letter2_date; flagged rows are not applied
+            updated_rows = []
+            for p_row, result in zip(Progress('apply prior list', total=len(prior_rows)).track(prior_rows), results):
+                if result['issue']:
+                    continue
+                for r in result['rows']:  # one master row, or one per site when the row has no site
+                    updated_rows.append(r)
+                    if 'status' in p_row and p_row['status']:
+                        r['status'] = p_row['status']
+                    if 'letter1_date' in p_row:
+                        r['letter1_date'] = p_row['letter1_date']
+                    if 'letter2_date' in p_row:
+                        r['letter2_date'] = p_row['letter2_date']
+
+            # Keep cross-site maternal flags current (e.g. newly Completed mothers)
+            from sparc.maternal_index import MaternalIndex  # lazy: pulls in sqlite3
+            index = MaternalIndex(output_dir)
+            index.update_statuses(updated_rows)
+            index.close()
+
+            # Persist prior-list updates to the master event logs
             if mgb_rows:
-                save_csv(mgb_rows, list(mgb_rows[0].keys()), mgb_path)
+                persist_master_changes(mgb_path, mgb_before, mgb_rows, run_id, C, backup_dir)
             if vumc_rows:
-                save_csv(vumc_rows, list(vumc_rows[0].keys()), vumc_path)
-        else:
-            print(f"Error: Prior list {args.prior_list} not found.")
-            return
+                persist_master_changes(vumc_path, vumc_before, vumc_rows, run_id, C, backup_dir)
+
+        phase = 'merged'
+        state['master_keys'] = master_file_keys(mgb_path, vumc_path)
+        checkpoint.save(phase, state)
 
-    # NOTE: We do NOT carry over holdovers. 
+    # NOTE: We do NOT carry over holdovers.
     total_needed = args.visits
-    print(f"Total target (Fresh Invites): {total_needed}")
-
-    # Determine site split (MGB vs VUMC) with exact rounding
-    mgb_ratio = C.get('MGB_RATIO', 0.6667)
-
-    # Build site configs based on available data
-    site_configs = []
-    if mgb_rows and vumc_rows:
-        # Both sites available - use normal ratio
-        mgb_target = int(total_needed * mgb_ratio + 0.5) # Round nearest
-        vumc_target = total_needed - mgb_target
-        site_configs = [
-            {'site': 'MGB', 'rows': mgb_rows, 'target': mgb_target},
-            {'site': 'VUMC', 'rows': vumc_rows, 'target': vumc_target}
-        ]
-    elif mgb_rows:
-        # Only MGB available
-        site_configs = [{'site': 'MGB', 'rows': mgb_rows, 'target': total_needed}]
-    elif vumc_rows:
-        # Only VUMC available
-        site_configs = [{'site': 'VUMC', 'rows': vumc_rows, 'target': total_needed}]
-
-    new_selections = []
-    strata = [f'S{i}' for i in range(1, 7)] # S1 to S6
-    weights = {s: C.get(f'{s}_WEIGHT', 0.1) for s in strata}
-
-    log_messages = []
-    log_messages.append(f"Recruitment Update - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-
-    for config in site_configs:
-        site = config['site']
-        rows = config['rows']
-        site_new_needed = config['target']
-        
-        log_messages.append(f"\nSite: {site} (Target New: {site_new_needed})")
-
-        # Calculate yield per stratum (uses site-specific overrides from CONSTANTS if available)
-        yields = {s: get_yield(rows, s, site=site, constants=C) for s in strata}
-        
-        # Adjust weights based on yield: W_s' = W_s / Yield_s
-        adjusted_weights = {s: weights[s] / yields[s] for s in strata}
-        total_adj_w = sum(adjusted_weights.values())
-        normalized_weights = {s: adjusted_weights[s] / total_adj_w for s in strata}
-        
-        # Largest Remainder Method for Allocation
-        float_targets = {s: site_new_needed * normalized_weights[s] for s in strata}
-        floor_targets = {s: int(v) for s, v in float_targets.items()}
-        remainder = site_new_needed - sum(floor_targets.values())
-        
-        # Sort by fractional part descending
-        fractional_parts = {s: v - int(v) for s, v in float_targets.items()}
-        sorted_strata = sorted(fractional_parts.keys(), key=lambda k: fractional_parts[k], reverse=True)
-        
-        # Distribute remainder
-        for i in range(remainder):
-            floor_targets[sorted_strata[i]] += 1
-            
-        # Select participants with cascade logic for shortfalls
-        # AIDEV-NOTE: If a stratum can't meet its target, the shortfall cascades to the next stratum
-        carryover = 0  # Shortfall from previous strata
-        site_selected_count = 0  # Track selections for this site
-
-        for idx, s in enumerate(strata):
-            original_target = floor_targets[s]
-            s_target = original_target + carryover  # Add any carryover from previous strata
-
-            eligible_rows = [r for r in rows if r['stratum'] == s and r['status'] == 'Not Invited' and r['eligible'] == '1']
-            available = len(eligible_rows)
-
-            # Log the target info
-            if carryover > 0:
-                log_messages.append(f"  {s}: Yield={yields[s]:.2f}, Base Target={original_target}, +Cascade={carryover}, Total Target={s_target}, Available={available}")
-            else:
-                log_messages.append(f"  {s}: Yield={yields[s]:.2f}, Target Invites={s_target}, Available={available}")
-
-            selected = []
-            if available <= s_target:
-                # Take all available, calculate new shortfall
-                selected = eligible_rows
-                shortfall = s_target - available
-                if shortfall > 0 and idx < len(strata) - 1:
-                    next_stratum = strata[idx + 1]
-                    log_messages.append(f"    WARNING: Ran out of {s}, shifting {shortfall} to {next_stratum}")
-                    carryover = shortfall
-                elif shortfall > 0:
-                    log_messages.append(f"    WARNING: Ran out of {s}, {shortfall} unfilled (no more strata)")
-                    carryover = 0
-                else:
-                    carryover = 0
-            else:
-                selected = random.sample(eligible_rows, s_target)
-                carryover = 0  # Met target, no carryover
-
-            for r in selected:
-                r['status'] = 'Pending'
-                r['last_contact_date'] = datetime.now().strftime('%Y-%m-%d')
-                r['date_added_to_recruitment'] = datetime.now().strftime('%Y-%m-%d')
-                r['letter1_date'] = '' # Initialize blank
-                r['letter2_date'] = '' # Initialize blank
-                new_selections.append(r)
-
-            site_selected_count += len(selected)
-            log_messages.append(f"    Added: {len(selected)}")
-
-        # Final summary for this site
-        unfilled = site_new_needed - site_selected_count
-        log_messages.append(f"  SITE SUMMARY: Target={site_new_needed}, Selected={site_selected_count}, Unfilled={unfilled}")
-
-    # Grand total summary
-    total_selected = len(new_selections)
-    total_unfilled = total_needed - total_selected
-    log_messages.append(f"\n=== GRAND TOTAL: Target={total_needed}, Selected={total_selected}, Unfilled={total_unfilled} ===")
-    if total_unfilled > 0:
-        log_messages.append(f"WARNING: Could not fill {total_unfilled} slots - insufficient eligible participants across all strata")
-
-    # Update Master Lists with new Pending status
-    if mgb_rows:
-        save_csv(mgb_rows, list(mgb_rows[0].keys()), mgb_path)
-    if vumc_rows:
-        save_csv(vumc_rows, list(vumc_rows[0].keys()), vumc_path)
-
-    random.shuffle(new_selections)
-    final_list = new_selections 
-
-    # Output CSV (blinded - excludes stratum and diagnosis fields)
+
+    if phase == 'merged':
+        mgb_before = capture(mgb_rows)
+        vumc_before = capture(vumc_rows)
+        print(f"Total target (Fresh Invites): {total_needed}")
+
+        # Determine site split (MGB vs VUMC) with exact rounding
+        mgb_ratio = C.get('MGB_RATIO', 0.6667)
+
+        # Build site configs based on available data
+        site_configs = []
+        if mgb_rows and vumc_rows:
+            # Both sites available - use normal ratio
+            mgb_target = int(total_needed * mgb_ratio + 0.5) # Round nearest
+            vumc_target = total_needed - mgb_target
+            site_configs = [
+                {'site': 'MGB', 'rows': mgb_rows, 'target': mgb_target},
+                {'site': 'VUMC', 'rows': vumc_rows, 'target': vumc_target}
+            ]
+        elif mgb_rows:
+            # Only MGB available
+            site_configs = [{'site': 'MGB', 'rows': mgb_rows, 'target': total_needed}]
+        elif vumc_rows:
+            # Only VUMC available
+            site_configs = [{'site': 'VUMC', 'rows': vumc_rows, 'target': total_needed}]
+
+        new_selections = []
+        strata = get_strata(C)  # S1 .. Sn from STRATUM_CUTS
+        weights = {s: C.get(f'{s}_WEIGHT', 0.1) for s in strata}
+
+        log_messages = []
+        log_messages.append(f"Recruitment Update - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        log_messages.append(f"Run ID: {run_id}")
+        log_messages.append(f"Seed: {seed}")
+
+        for config in site_configs:
+            site = config['site']
+            log_messages.append(f"\nSite: {site} (Target New: {config['target']})")
+            new_selections.extend(select_site(
+                site, config['rows'], config['target'], strata, weights, C, log_messages, seed,
+                progress=Progress(f'select {site}', total=len(config['rows']))))
+
+        # Grand total summary
+        total_selected = len(new_selections)
+        total_unfilled = total_needed - total_selected
+        log_messages.append(f"\n=== GRAND TOTAL: Target={total_needed}, Selected={total_selected}, Unfilled={total_unfilled} ===")
+        if total_unfilled > 0:
+            log_messages.append(f"WARNING: Could not fill {total_unfilled} slots - insufficient eligible participants across all strata")
+
+        # Update Master Lists with new Pending status (appended to the event logs)
+        if mgb_rows:
+            persist_master_changes(mgb_path, mgb_before, mgb_rows, run_id, C, backup_dir)
+        if vumc_rows:
+            persist_master_changes(vumc_path, vumc_before, vumc_rows, run_id, C, backup_dir)
+
+        stream(seed, 'shuffle').shuffle(new_selections)
+        state['new_selections'] = new_selections
+        state['log_messages'] = log_messages
+        phase = 'selected'
+        state['master_keys'] = master_file_keys(mgb_path, vumc_path)
+        checkpoint.save(phase, state)
+
+    final_list = state['new_selections']
+    log_messages = state['log_messages']
+
+    # Output CSVs (blinded - excludes stratum and diagnosis fields)
     if final_list:
-        # AIDEV-NOTE: Recruitment list is blinded - excludes model_score, model_pctile, stratum, and diagnosis fields
-        # The sampling still uses stratification internally, but the output list doesn't reveal stratum assignment
-        blinded_fields = ['model_score', 'model_pctile', 'stratum']
-        fieldnames = [f for f in final_list[0].keys()
-                      if f not in blinded_fields and 'diagnosis' not in f.lower()]
-        # Ensure new columns are in output
-        for f in ['date_added_to_recruitment', 'letter1_date', 'letter2_date']:
-            if f not in fieldnames: fieldnames.append(f)
-        
+        from sparc.export_recruitment import export_recruitment  # lazy: pulls in concurrent.futures
         today_ts = datetime.now().strftime('%Y%m%d')
-        output_path = os.path.join(output_dir, f"recruitment_{today_ts}.csv")
-        save_csv(final_list, fieldnames, output_path)
-        print(f"Saved recruitment list to {output_path}")
-        
-        # Backup
-        if not os.path.exists(backup_dir): os.makedirs(backup_dir)
-        shutil.copy(output_path, os.path.join(backup_dir, f"recruitment_{today_ts}_{datetime.now().strftime('%H%M')}.csv"))
+        written = export_recruitment(final_list, output_dir, backup_dir, today_ts,
+                                     datetime.now().strftime('%H%M'), wave_size=args.wave_size)
+        for path, count in written.items():
+            print(f"Saved {count} rows to {path}")
 
     # Logging
     log_content = "\n".join(log_messages)
@@ -290,6 +367,7 @@ def main():
     if not os.path.exists(log_dir): os.makedirs(log_dir)
     with open(os.path.join(log_dir, f"recruitment_{datetime.now().strftime('%Y%m%d')}.log"), 'a') as f:
         f.write(log_content + "\n")
+    checkpoint.clear()
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())